@@ -0,0 +1,190 @@
+"""
+Dataset-wide statistics for the degrees graph.
+
+Usage: python analytics.py directory [--source PERSON] [--sweeps N]
+                           [--seed S]
+
+Searches are level-synchronous: each step expands the whole frontier at
+once with NumPy boolean masks over the graph's CSR arrays, first from
+people to their movies and then from those movies to their stars. The
+report covers the histogram of separations from one person, the sizes of
+the connected components and an approximate diameter found by repeated
+double sweeps.
+"""
+
+import argparse
+import random
+
+import numpy as np
+
+import degrees
+
+UNREACHABLE = -1
+
+
+class GraphArrays():
+    """
+    NumPy views of a Graph's CSR arrays plus both edge lists expanded,
+    so a frontier can be pushed across every edge in one masked step.
+    """
+
+    def __init__(self, graph):
+        self.people = graph.people_count()
+        self.movies = graph.movie_count()
+        self.person_offsets = np.frombuffer(graph.person_offsets, dtype=np.intc)
+        self.person_movies = np.frombuffer(graph.person_movies, dtype=np.intc)
+        self.movie_offsets = np.frombuffer(graph.movie_offsets, dtype=np.intc)
+        self.movie_people = np.frombuffer(graph.movie_people, dtype=np.intc)
+
+        # Owner of every entry in person_movies and movie_people
+        self.edge_people = np.repeat(np.arange(self.people, dtype=np.intc),
+                                     np.diff(self.person_offsets))
+        self.edge_movies = np.repeat(np.arange(self.movies, dtype=np.intc),
+                                     np.diff(self.movie_offsets))
+
+
+def distances_from(arrays, source):
+    """
+    Returns an array with the separation of every person from the
+    `source` person int, or UNREACHABLE.
+    """
+    distances = np.full(arrays.people, UNREACHABLE, dtype=np.intc)
+    seen_movies = np.zeros(arrays.movies, dtype=bool)
+    frontier = np.zeros(arrays.people, dtype=bool)
+    frontier[source] = True
+    distances[source] = 0
+
+    depth = 0
+    while frontier.any():
+        depth += 1
+
+        # Movies starring anyone in the frontier that were not used yet
+        movies = np.zeros(arrays.movies, dtype=bool)
+        movies[arrays.person_movies[frontier[arrays.edge_people]]] = True
+        movies &= ~seen_movies
+        seen_movies |= movies
+
+        # Stars of those movies that have no distance yet
+        frontier = np.zeros(arrays.people, dtype=bool)
+        frontier[arrays.movie_people[movies[arrays.edge_movies]]] = True
+        frontier &= distances == UNREACHABLE
+        distances[frontier] = depth
+
+    return distances
+
+
+def separation_histogram(arrays, source):
+    """
+    Returns (counts, unreachable): counts[d] is the number of people at
+    separation d from `source`, and unreachable the number of people not
+    connected to it.
+    """
+    distances = distances_from(arrays, source)
+    reached = distances[distances != UNREACHABLE]
+    return np.bincount(reached), int(arrays.people - len(reached))
+
+
+def component_labels(arrays):
+    """
+    Labels every person with the smallest person int in its connected
+    component, by alternating min-label propagation through movies and
+    pointer jumping until nothing changes.
+    """
+    labels = np.arange(arrays.people, dtype=np.intc)
+    starring = np.flatnonzero(np.diff(arrays.person_offsets))
+    cast = np.flatnonzero(np.diff(arrays.movie_offsets))
+
+    while True:
+        movie_labels = np.zeros(arrays.movies, dtype=np.intc)
+        movie_labels[cast] = np.minimum.reduceat(
+            labels[arrays.movie_people], arrays.movie_offsets[cast]
+        )
+        updated = labels.copy()
+        updated[starring] = np.minimum(labels[starring], np.minimum.reduceat(
+            movie_labels[arrays.person_movies], arrays.person_offsets[starring]
+        ))
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
+
+def component_sizes(arrays):
+    """
+    Returns the sizes of all connected components, largest first, and
+    the labels from component_labels.
+    """
+    labels = component_labels(arrays)
+    sizes = np.bincount(labels, minlength=arrays.people)
+    return np.sort(sizes[sizes > 0])[::-1], labels
+
+
+def approximate_diameter(arrays, labels, sweeps=4, seed=0):
+    """
+    Estimates the diameter of the largest component with double sweeps:
+    starting from a random person, each sweep jumps to a person farthest
+    from the previous one. Returns (lower, upper, eccentricities), where
+    the true diameter lies in [lower, upper] and eccentricities lists the
+    (person, eccentricity) pairs found.
+    """
+    sizes = np.bincount(labels, minlength=arrays.people)
+    members = np.flatnonzero(labels == np.argmax(sizes))
+
+    rng = random.Random(seed)
+    person = int(members[rng.randrange(len(members))])
+    eccentricities = []
+    for _ in range(sweeps):
+        distances = distances_from(arrays, person)
+        eccentricity = int(distances.max())
+        eccentricities.append((person, eccentricity))
+        person = int(np.argmax(distances))
+
+    lower = max(eccentricity for _, eccentricity in eccentricities)
+    upper = 2 * min(eccentricity for _, eccentricity in eccentricities)
+    return lower, upper, eccentricities
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("directory")
+    parser.add_argument("--source", default=None,
+                        help="person id or name for the separation histogram")
+    parser.add_argument("--sweeps", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    degrees.load_data(args.directory)
+    graph = degrees.graph
+    arrays = GraphArrays(graph)
+    print(f"{arrays.people} people, {arrays.movies} movies, "
+          f"{len(arrays.person_movies)} credits")
+
+    if args.source is not None:
+        source = args.source
+        if source not in degrees.people:
+            source = degrees.person_id_for_name(source, interactive=False)
+        if source is None:
+            parser.error("source person not found or ambiguous")
+        counts, unreachable = separation_histogram(
+            arrays, graph.person_index[source]
+        )
+        print(f"Separations from {degrees.people[source]['name']}")
+        for separation, count in enumerate(counts):
+            print(f"  {separation}: {count}")
+        print(f"  not connected: {unreachable}")
+
+    sizes, labels = component_sizes(arrays)
+    print(f"{len(sizes)} connected components")
+    print(f"  largest: {', '.join(str(size) for size in sizes[:10])}")
+    print(f"  singletons: {int(np.count_nonzero(sizes == 1))}")
+
+    lower, upper, eccentricities = approximate_diameter(
+        arrays, labels, args.sweeps, args.seed
+    )
+    print(f"Diameter of the largest component: between {lower} and {upper}")
+    for person, eccentricity in eccentricities:
+        print(f"  eccentricity of {graph.person_ids[person]}: {eccentricity}")
+
+
+if __name__ == "__main__":
+    main()
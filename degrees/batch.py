@@ -0,0 +1,145 @@
+"""
+Answers many (source, target) queries at once.
+
+Usage: python batch.py directory [pairs]
+
+Pairs are read from the `pairs` file, or from stdin when it is omitted or
+"-", either as JSON lines ({"source": ..., "target": ...} or [source,
+target]) or as CSV rows (source,target, with an optional header). People
+may be given by id or by an unambiguous name. Queries are grouped by
+source so each source needs a single breadth-first search, and one JSON
+result per query is written to stdout as soon as it is known.
+"""
+
+import csv
+import json
+import sys
+
+import degrees
+
+
+def read_pairs(stream):
+    """
+    Returns a list of (source, target) strings read from `stream`,
+    detecting JSON lines or CSV from the first non-blank line.
+    """
+    lines = [line for line in stream if line.strip()]
+    if not lines:
+        return []
+
+    if lines[0].lstrip().startswith(("{", "[")):
+        pairs = []
+        for line in lines:
+            record = json.loads(line)
+            if isinstance(record, dict):
+                pairs.append((str(record["source"]), str(record["target"])))
+            else:
+                pairs.append((str(record[0]), str(record[1])))
+        return pairs
+
+    rows = [row for row in csv.reader(lines) if row]
+    if [field.strip().lower() for field in rows[0]] == ["source", "target"]:
+        rows = rows[1:]
+    return [(row[0].strip(), row[1].strip()) for row in rows]
+
+
+def resolve_person(value):
+    """
+    Returns the person_id for `value`, which may be a person_id or a name
+    matching exactly one person, or None.
+    """
+    if value in degrees.people:
+        return value
+    person_ids = degrees.names.get(value.lower(), set())
+    if len(person_ids) == 1:
+        return next(iter(person_ids))
+    return None
+
+
+def group_by_source(pairs):
+    """
+    Groups queries by resolved source.
+    Returns (groups, errors): groups maps each source person_id to a list
+    of (index, target person_id), and errors lists the result records of
+    queries naming an unknown or ambiguous person.
+    """
+    groups = {}
+    errors = []
+    for index, (source, target) in enumerate(pairs):
+        source_id = resolve_person(source)
+        target_id = resolve_person(target)
+        if source_id is None or target_id is None:
+            errors.append({
+                "index": index,
+                "source": source,
+                "target": target,
+                "error": "person not found"
+            })
+        else:
+            groups.setdefault(source_id, []).append((index, target_id))
+    return groups, errors
+
+
+def answer_group(source, queries):
+    """
+    Yields a result record for every (index, target) query from `source`,
+    using one breadth-first search for the whole group.
+    """
+    indexes = {}
+    for index, target in queries:
+        indexes.setdefault(target, []).append(index)
+
+    # A lone target is answered faster by searching from both ends
+    if len(indexes) == 1:
+        target = next(iter(indexes))
+        answers = [(target, degrees.shortest_path(source, target))]
+    else:
+        answers = degrees.shortest_paths_from(source, list(indexes))
+
+    for target, path in answers:
+        for index in indexes[target]:
+            yield result_record(index, source, target, path)
+
+
+def result_record(index, source, target, path):
+    record = {"index": index, "source": source, "target": target}
+    if path is None:
+        record["degrees"] = None
+        record["path"] = None
+    else:
+        record["degrees"] = len(path)
+        record["path"] = [[movie_id, person_id] for movie_id, person_id in path]
+    return record
+
+
+def run_batch(pairs):
+    """
+    Yields a result record for every (source, target) pair, streaming
+    each source group's answers as its search finds them.
+    """
+    groups, errors = group_by_source(pairs)
+    yield from errors
+    for source, queries in groups.items():
+        yield from answer_group(source, queries)
+
+
+def main():
+    if len(sys.argv) not in (2, 3):
+        sys.exit("Usage: python batch.py directory [pairs]")
+    directory = sys.argv[1]
+    filename = sys.argv[2] if len(sys.argv) == 3 else "-"
+
+    degrees.load_data(directory)
+
+    if filename == "-":
+        pairs = read_pairs(sys.stdin)
+    else:
+        with open(filename, encoding="utf-8") as f:
+            pairs = read_pairs(f)
+
+    for record in run_batch(pairs):
+        print(json.dumps(record), flush=True)
+
+
+if __name__ == "__main__":
+    main()
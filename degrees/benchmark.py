@@ -0,0 +1,99 @@
+"""
+Benchmarks for the degrees search.
+
+Usage: python benchmark.py [directory] [--pairs N] [--seed S]
+                           [--frontier-size N]
+"""
+
+import argparse
+import random
+import time
+
+import degrees
+from util import (Node, StackFrontier, QueueFrontier,
+                  DequeStackFrontier, DequeQueueFrontier)
+
+
+def search_benchmark(pairs):
+    """
+    Runs plain and bidirectional search on every (source, target) pair and
+    returns a dict of totals per mode: nodes expanded, seconds, paths found.
+    """
+    totals = {}
+    for mode, bidirectional in (("bfs", False), ("bidirectional", True)):
+        expanded = 0
+        found = 0
+        start = time.perf_counter()
+        for source, target in pairs:
+            stats = {}
+            path = degrees.shortest_path(source, target,
+                                         bidirectional=bidirectional,
+                                         stats=stats)
+            expanded += stats["expanded"]
+            if path is not None:
+                found += 1
+        totals[mode] = {
+            "expanded": expanded,
+            "seconds": time.perf_counter() - start,
+            "found": found
+        }
+    return totals
+
+
+def frontier_benchmark(size):
+    """
+    Times `size` guarded adds followed by `size` removals on the list-based
+    and deque-based frontiers, the same pattern breadth-first search uses.
+    Returns a dict mapping each frontier class name to seconds.
+    """
+    timings = {}
+    for frontier_class in (StackFrontier, QueueFrontier,
+                           DequeStackFrontier, DequeQueueFrontier):
+        frontier = frontier_class()
+        start = time.perf_counter()
+        for state in range(size):
+            if not frontier.contains_state(state):
+                frontier.add(Node(state=state, parent=None, action=None))
+        while not frontier.empty():
+            frontier.remove()
+        timings[frontier_class.__name__] = time.perf_counter() - start
+    return timings
+
+
+def random_pairs(count, seed):
+    """
+    Returns `count` random (source, target) pairs of person ids.
+    """
+    rng = random.Random(seed)
+    person_ids = sorted(degrees.people)
+    return [(rng.choice(person_ids), rng.choice(person_ids))
+            for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--pairs", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--frontier-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"Frontier microbenchmark with {args.frontier_size} states")
+    for name, seconds in frontier_benchmark(args.frontier_size).items():
+        print(f"  {name}: {seconds:.3f}s")
+
+    print("Loading data...")
+    degrees.load_data(args.directory)
+    print("Data loaded.")
+
+    pairs = random_pairs(args.pairs, args.seed)
+    totals = search_benchmark(pairs)
+
+    print(f"Shortest path search over {len(pairs)} random pairs")
+    for mode, result in totals.items():
+        print(f"  {mode}: {result['expanded']} nodes expanded, "
+              f"{result['seconds']:.3f}s, {result['found']} paths found")
+
+
+if __name__ == "__main__":
+    main()
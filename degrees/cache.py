@@ -0,0 +1,84 @@
+"""
+Bounded LRU cache in front of degrees.shortest_path.
+"""
+
+from collections import OrderedDict
+
+import degrees
+
+
+class PathCache():
+    """
+    Caches shortest paths by (source, target).
+
+    A cached path also answers the reversed pair, and the whole cache is
+    dropped when degrees.data_version changes. Hits, misses, evictions and
+    invalidations are counted for monitoring.
+    """
+
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def shortest_path(self, source, target):
+        """
+        Returns degrees.shortest_path(source, target), from the cache when
+        the pair or its reverse was asked for before.
+        """
+        if self.version != degrees.data_version:
+            if self.entries:
+                self.invalidations += 1
+            self.entries.clear()
+            self.version = degrees.data_version
+
+        key = (source, target)
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+        reverse = (target, source)
+        if reverse in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(reverse)
+            return reverse_path(target, self.entries[reverse])
+
+        self.misses += 1
+        path = degrees.shortest_path(source, target)
+        self.entries[key] = path
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        return path
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self):
+        """
+        Returns the cache counters as a dict.
+        """
+        return {
+            "size": len(self.entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations
+        }
+
+
+def reverse_path(source, path):
+    """
+    Turns a (movie_id, person_id) path that starts at `source` into the
+    path from its last person back to `source`.
+    """
+    if path is None:
+        return None
+    people = [source] + [person_id for _, person_id in path]
+    return [(path[i][0], people[i]) for i in range(len(path) - 1, -1, -1)]
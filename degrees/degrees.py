@@ -1,55 +1,117 @@
 import csv
+import heapq
+import json
+import math
+import os
 import sys
+from array import array
 
-from util import Node, StackFrontier, QueueFrontier
+from graph import Graph, Records, INDEX_TYPE
+from name_index import load_name_index
+from snapshot import load_snapshot, save_snapshot, source_fingerprint
+from util import Node, DequeQueueFrontier
 
 # Maps names to a set of corresponding person_ids
 names = {}
 
-# Maps person_ids to a dictionary of: name, birth, movies (a set of movie_ids)
+# Maps person_ids to a dictionary of: name, birth
 people = {}
 
-# Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
+# Maps movie_ids to a dictionary of: title, year
 movies = {}
 
+# Co-star edges between people and movies, interned to ints
+graph = None
+
+# Prefix and typo-tolerant lookup of people by name
+name_index = None
+
+# Identifies the loaded dataset; changes whenever load_data reads new files
+data_version = None
+
+# Graphs with at least this many people use bidirectional search by default
+BIDIRECTIONAL_THRESHOLD = 10000
+
 
 def load_data(directory):
     """
-    Load data from CSV files into memory.
+    Load data into memory, from the binary snapshot in `directory` when it
+    is up to date and otherwise from the CSV files, writing a new snapshot
+    for the next run.
+    """
+    global graph, people, movies, data_version, name_index
+
+    loaded = load_snapshot(directory)
+    if loaded is None:
+        loaded = read_csv_data(directory)
+        try:
+            save_snapshot(directory, *loaded)
+        except OSError:
+            pass
+    graph, people_fields, movie_fields = loaded
+    data_version = json.dumps([os.path.abspath(directory),
+                               source_fingerprint(directory)])
+
+    people = Records(graph.person_index, people_fields)
+    movies = Records(graph.movie_index, movie_fields)
+
+    names.clear()
+    for person_id, name in zip(graph.person_ids, people_fields["name"]):
+        if name.lower() not in names:
+            names[name.lower()] = {person_id}
+        else:
+            names[name.lower()].add(person_id)
+    name_index = load_name_index(directory, people_fields["name"])
+
+
+def read_csv_data(directory):
+    """
+    Parse the CSV files in `directory`.
+    Returns (graph, people_fields, movie_fields), where the field dicts map
+    each field name to a list aligned with the graph's interned ids.
     """
     # Load people
+    people_rows = {}
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
         for row in reader:
-            people[row["id"]] = {
-                "name": row["name"],
-                "birth": row["birth"],
-                "movies": set()
-            }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
-            else:
-                names[row["name"].lower()].add(row["id"])
+            people_rows[row["id"]] = (row["name"], row["birth"])
 
     # Load movies
+    movie_rows = {}
     with open(f"{directory}/movies.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
         for row in reader:
-            movies[row["id"]] = {
-                "title": row["title"],
-                "year": row["year"],
-                "stars": set()
-            }
+            movie_rows[row["id"]] = (row["title"], row["year"])
 
-    # Load stars
+    # Load stars as parallel arrays of interned ids
+    person_ids = list(people_rows)
+    movie_ids = list(movie_rows)
+    person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+    movie_index = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+    edge_people = array(INDEX_TYPE)
+    edge_movies = array(INDEX_TYPE)
     with open(f"{directory}/stars.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
         for row in reader:
             try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
+                person = person_index[row["person_id"]]
+                movie = movie_index[row["movie_id"]]
             except KeyError:
-                pass
+                continue
+            edge_people.append(person)
+            edge_movies.append(movie)
+
+    graph = Graph.from_edges(person_ids, movie_ids, edge_people, edge_movies)
+    people_fields = {
+        "name": [name for name, _ in people_rows.values()],
+        "birth": [birth for _, birth in people_rows.values()]
+    }
+    movie_fields = {
+        "title": [title for title, _ in movie_rows.values()],
+        "year": [year for _, year in movie_rows.values()]
+    }
+    return graph, people_fields, movie_fields
 
 
 def main():
@@ -84,21 +146,58 @@ def main():
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, bidirectional=None, stats=None,
+                  landmarks=None):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
     If no possible path, returns None.
+
+    By default the search grows frontiers from both ends on graphs with
+    at least BIDIRECTIONAL_THRESHOLD people and falls back to plain
+    breadth-first search on smaller ones; pass `bidirectional` to force
+    either mode. Given a LandmarkIndex in `landmarks`, its distance bounds
+    prune the bidirectional search, and the one-sided search becomes A*
+    with the landmark lower bound as heuristic. If `stats` is a dict, the
+    number of expanded nodes is stored in stats["expanded"].
     """
+    start = graph.person_index[source]
+    goal = graph.person_index[target]
+
+    if bidirectional is None:
+        bidirectional = graph.people_count() >= BIDIRECTIONAL_THRESHOLD
+    if bidirectional:
+        path = bidirectional_path(start, goal, stats, landmarks)
+    elif landmarks is not None:
+        path = astar_path(start, goal, landmarks.heuristic(goal), stats)
+    else:
+        path = breadth_first_path(start, goal, stats)
+
+    if path is None:
+        return None
+    return [(graph.movie_ids[movie], graph.person_ids[person])
+            for movie, person in path]
+
+
+def breadth_first_path(source, target, stats=None):
+    """
+    Plain breadth-first search over the interned graph from `source`
+    until `target` is removed from the frontier. Returns a list of
+    (movie, person) int pairs, or None.
+    """
+    expanded = 0
+
     # Initialize frontier to just the starting position
-    frontier = QueueFrontier()
+    frontier = DequeQueueFrontier()
     # Add starting node to frontier
     frontier.add(Node(state=source, parent=None, action=None))
-    
+
     # Set of explored paths
     explored = set()
 
+    path = None
+
     # While frontier is not empty
     while not frontier.empty():
         # Remove a node from the frontier
@@ -113,31 +212,285 @@ def shortest_path(source, target):
                 node = node.parent
             # Reverse the list
             path.reverse()
-            return path
+            break
 
         # Mark node as explored
         explored.add(node.state)
+        expanded += 1
 
         # Add neighbors to frontier
-        for movies_id, person_id in neighbors_for_person(node.state):
-            if not frontier.contains_state(person_id) and person_id not in explored:
-                frontier.add(Node(state=person_id, parent=node, action=movies_id))
+        for movie, person in graph.neighbors(node.state):
+            if not frontier.contains_state(person) and person not in explored:
+                frontier.add(Node(state=person, parent=node, action=movie))
+
+    if stats is not None:
+        stats["expanded"] = expanded
+    return path
+
+
+def bidirectional_path(source, target, stats=None, landmarks=None):
+    """
+    Breadth-first search over the interned graph from both `source` and
+    `target` at once. Returns a list of (movie, person) int pairs, or None.
+
+    Each round expands one whole layer of the smaller frontier, and the
+    search stops as soon as a newly discovered person has already been
+    reached from the other side. Because people are checked as they are
+    discovered, the first meeting point always lies on a shortest path.
+
+    Given a LandmarkIndex in `landmarks`, people whose depth plus lower
+    bound to the far end exceeds the pair's upper bound cannot be on a
+    shortest path and are not expanded.
+    """
+    expanded = 0
+    path = None
+
+    # Maps each reached person to the (movie, person) step that
+    # leads back towards the side it was reached from
+    forward = {source: None}
+    backward = {target: None}
+    forward_layer = [source]
+    backward_layer = [target]
+    forward_depth = backward_depth = 0
+
+    meeting = source if source == target else None
+
+    if landmarks is not None:
+        lower, upper = landmarks.bounds(source, target)
+        if lower == math.inf:
+            forward_layer = []
+        to_target = landmarks.heuristic(target)
+        to_source = landmarks.heuristic(source)
+
+    while meeting is None and forward_layer and backward_layer:
+        # Always grow the side with fewer people waiting to be expanded
+        if len(forward_layer) <= len(backward_layer):
+            layer, reached, other = forward_layer, forward, backward
+            forward_depth += 1
+            depth = forward_depth
+        else:
+            layer, reached, other = backward_layer, backward, forward
+            backward_depth += 1
+            depth = backward_depth
+        if landmarks is not None:
+            estimate = to_target if reached is forward else to_source
+
+        next_layer = []
+        for person in layer:
+            expanded += 1
+            for movie, neighbor in graph.neighbors(person):
+                if neighbor in reached:
+                    continue
+                reached[neighbor] = (movie, person)
+                if neighbor in other:
+                    meeting = neighbor
+                    break
+                if landmarks is None or depth + estimate(neighbor) <= upper:
+                    next_layer.append(neighbor)
+            if meeting is not None:
+                break
 
-    return None
-    raise NotImplementedError("No solution.")
+        if reached is forward:
+            forward_layer = next_layer
+        else:
+            backward_layer = next_layer
 
+    if meeting is not None:
+        path = []
+        # Walk back from the meeting point to the source
+        person = meeting
+        while forward[person] is not None:
+            movie, previous = forward[person]
+            path.append((movie, person))
+            person = previous
+        path.reverse()
 
+        # Walk forward from the meeting point to the target
+        person = meeting
+        while backward[person] is not None:
+            movie, following = backward[person]
+            path.append((movie, following))
+            person = following
 
+    if stats is not None:
+        stats["expanded"] = expanded
+    return path
 
-def person_id_for_name(name):
+
+def astar_path(source, target, heuristic, stats=None):
+    """
+    A* search over the interned graph from `source` to `target`, where
+    `heuristic(person)` never overestimates the hops left to `target` and
+    returns math.inf for people that cannot reach it. Returns a list of
+    (movie, person) int pairs, or None.
+    """
+    expanded = 0
+    path = None
+
+    # Maps each reached person to its hop count and the step that led to it
+    hops = {source: 0}
+    parents = {source: None}
+    explored = set()
+    frontier = [(heuristic(source), 0, source)]
+
+    while frontier:
+        _, distance, person = heapq.heappop(frontier)
+        if person in explored:
+            continue
+
+        if person == target:
+            path = []
+            while parents[person] is not None:
+                movie, previous = parents[person]
+                path.append((movie, person))
+                person = previous
+            path.reverse()
+            break
+
+        explored.add(person)
+        expanded += 1
+
+        for movie, neighbor in graph.neighbors(person):
+            if neighbor in explored or hops.get(neighbor, math.inf) <= distance + 1:
+                continue
+            estimate = heuristic(neighbor)
+            if estimate == math.inf:
+                continue
+            hops[neighbor] = distance + 1
+            parents[neighbor] = (movie, person)
+            heapq.heappush(frontier,
+                           (distance + 1 + estimate, distance + 1, neighbor))
+
+    if stats is not None:
+        stats["expanded"] = expanded
+    return path
+
+
+def shortest_paths_from(source, targets):
+    """
+    Runs a single breadth-first search from `source` and yields
+    (target, path) for every person_id in `targets` as soon as its
+    shortest path is known, in the same format as shortest_path.
+    Targets that are not connected to `source` are yielded last with
+    a path of None.
+    """
+    start = graph.person_index[source]
+    pending = {}
+    for target in targets:
+        pending.setdefault(graph.person_index[target], []).append(target)
+
+    # Maps each reached person to the (movie, person) step that led to it
+    parents = {start: None}
+    layer = [start]
+    while True:
+        for person in [person for person in layer if person in pending]:
+            path = []
+            step = person
+            while parents[step] is not None:
+                movie, previous = parents[step]
+                path.append((graph.movie_ids[movie], graph.person_ids[step]))
+                step = previous
+            path.reverse()
+            for target in pending.pop(person):
+                yield target, path
+
+        if not pending or not layer:
+            break
+
+        next_layer = []
+        for person in layer:
+            for movie, neighbor in graph.neighbors(person):
+                if neighbor not in parents:
+                    parents[neighbor] = (movie, person)
+                    next_layer.append(neighbor)
+        layer = next_layer
+
+    for unreachable in pending.values():
+        for target in unreachable:
+            yield target, None
+
+
+def all_shortest_paths(source, target, limit=None):
+    """
+    Yields every shortest list of (movie_id, person_id) pairs that connects
+    the source to the target, or only the first `limit` of them.
+
+    A breadth-first search records, for each person up to the target's
+    layer, every (movie, person) step from the previous layer. Paths are
+    then walked lazily out of that layered graph, so memory is bounded by
+    its size however many paths there are, and the consumer may stop at
+    any time. Nothing is yielded if the two people are not connected.
+    """
+    if limit is not None and limit <= 0:
+        return
+
+    start = graph.person_index[source]
+    goal = graph.person_index[target]
+
+    # Maps each reached person to its depth and to all steps reaching it
+    # from the previous layer
+    depth = {start: 0}
+    parents = {start: []}
+    layer = [start]
+    while layer and goal not in depth:
+        next_layer = []
+        for person in layer:
+            for movie, neighbor in graph.neighbors(person):
+                if neighbor not in depth:
+                    depth[neighbor] = depth[person] + 1
+                    parents[neighbor] = [(movie, person)]
+                    next_layer.append(neighbor)
+                elif depth[neighbor] == depth[person] + 1:
+                    parents[neighbor].append((movie, person))
+        layer = next_layer
+    if goal not in depth:
+        return
+
+    if start == goal:
+        yield []
+        return
+
+    # Depth-first walk from the target back to the source. Each stack
+    # entry is a person on the current partial path with an iterator over
+    # its parent steps; `path` holds one step per entry below the target.
+    count = 0
+    path = []
+    stack = [(goal, iter(parents[goal]))]
+    while stack:
+        child, steps = stack[-1]
+        step = next(steps, None)
+        if step is None:
+            stack.pop()
+            if path:
+                path.pop()
+            continue
+
+        movie, parent = step
+        path.append((graph.movie_ids[movie], graph.person_ids[child]))
+        if parent == start:
+            yield path[::-1]
+            count += 1
+            if limit is not None and count >= limit:
+                return
+            path.pop()
+        else:
+            stack.append((parent, iter(parents[parent])))
+
+
+def person_id_for_name(name, interactive=True):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
+
+    When `interactive` is False, ambiguous names return None instead of
+    prompting; use find_people to get ranked candidates.
     """
     person_ids = list(names.get(name.lower(), set()))
     if len(person_ids) == 0:
         return None
     elif len(person_ids) > 1:
+        if not interactive:
+            return None
         print(f"Which '{name}'?")
         for person_id in person_ids:
             person = people[person_id]
@@ -155,17 +508,23 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def find_people(name, limit=10):
+    """
+    Returns up to `limit` (person_id, score) candidates for `name`, best
+    first: exact matches score 1, then prefix matches, then names that
+    look alike, so misspelled names still find someone.
+    """
+    return [(graph.person_ids[person], score)
+            for person, score in name_index.search(name, limit)]
+
+
 def neighbors_for_person(person_id):
     """
-    Returns (movie_id, person_id) pairs for people
+    Yields (movie_id, person_id) pairs for people
     who starred with a given person.
     """
-    movie_ids = people[person_id]["movies"]
-    neighbors = set()
-    for movie_id in movie_ids:
-        for person_id in movies[movie_id]["stars"]:
-            neighbors.add((movie_id, person_id))
-    return neighbors
+    for movie, person in graph.neighbors(graph.person_index[person_id]):
+        yield graph.movie_ids[movie], graph.person_ids[person]
 
 
 if __name__ == "__main__":
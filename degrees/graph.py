@@ -0,0 +1,140 @@
+from array import array
+from collections.abc import Mapping
+
+# Type code used for every id and offset array
+INDEX_TYPE = "i"
+
+
+class Graph():
+    """
+    Bipartite person/movie graph with string ids interned to dense ints.
+
+    Edges are stored CSR-style in flat arrays: the movies of person `p` are
+    person_movies[person_offsets[p]:person_offsets[p + 1]], and the stars
+    of movie `m` are movie_people[movie_offsets[m]:movie_offsets[m + 1]].
+    """
+
+    def __init__(self, person_ids, movie_ids,
+                 person_offsets, person_movies, movie_offsets, movie_people):
+        self.person_ids = person_ids
+        self.movie_ids = movie_ids
+        self.person_index = {
+            person_id: i for i, person_id in enumerate(person_ids)
+        }
+        self.movie_index = {
+            movie_id: i for i, movie_id in enumerate(movie_ids)
+        }
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_people = movie_people
+
+    @classmethod
+    def from_edges(cls, person_ids, movie_ids, edge_people, edge_movies):
+        """
+        Builds a graph from parallel arrays of (person, movie) int edges.
+        Duplicate edges are dropped.
+        """
+        person_offsets, person_movies = _compress(
+            len(person_ids), edge_people, edge_movies
+        )
+
+        # Expand the deduplicated person rows back into edges so the
+        # movie side is built from the same edge set
+        edge_people = array(INDEX_TYPE, [0]) * len(person_movies)
+        for person in range(len(person_ids)):
+            for i in range(person_offsets[person], person_offsets[person + 1]):
+                edge_people[i] = person
+        movie_offsets, movie_people = _compress(
+            len(movie_ids), person_movies, edge_people
+        )
+
+        return cls(person_ids, movie_ids,
+                   person_offsets, person_movies, movie_offsets, movie_people)
+
+    def people_count(self):
+        return len(self.person_ids)
+
+    def movie_count(self):
+        return len(self.movie_ids)
+
+    def movies_of(self, person):
+        """
+        Returns the movies `person` starred in as a slice of ints.
+        """
+        return self.person_movies[
+            self.person_offsets[person]:self.person_offsets[person + 1]
+        ]
+
+    def stars_of(self, movie):
+        """
+        Returns the people who starred in `movie` as a slice of ints.
+        """
+        return self.movie_people[
+            self.movie_offsets[movie]:self.movie_offsets[movie + 1]
+        ]
+
+    def neighbors(self, person):
+        """
+        Yields (movie, person) int pairs for people who starred with
+        `person`, including `person` itself once per movie.
+        """
+        movie_offsets = self.movie_offsets
+        movie_people = self.movie_people
+        for movie in self.movies_of(person):
+            for i in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                yield movie, movie_people[i]
+
+
+class Records(Mapping):
+    """
+    Read-only mapping from string ids to dicts of fields, backed by one
+    list per field and an id -> int index shared with the graph.
+    """
+
+    def __init__(self, index, fields):
+        self.index = index
+        self.fields = fields
+
+    def __getitem__(self, key):
+        i = self.index[key]
+        return {field: values[i] for field, values in self.fields.items()}
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def __len__(self):
+        return len(self.index)
+
+
+def _compress(rows, edge_rows, edge_columns):
+    """
+    Groups (row, column) edges by row with a counting sort and returns
+    (offsets, columns) CSR arrays, with each row sorted and deduplicated.
+    """
+    counts = array(INDEX_TYPE, [0]) * (rows + 1)
+    for row in edge_rows:
+        counts[row + 1] += 1
+    for row in range(rows):
+        counts[row + 1] += counts[row]
+
+    columns = array(INDEX_TYPE, [0]) * len(edge_rows)
+    cursor = array(INDEX_TYPE, counts)
+    for row, column in zip(edge_rows, edge_columns):
+        columns[cursor[row]] = column
+        cursor[row] += 1
+
+    # Sort each row and squeeze out duplicates in place
+    offsets = array(INDEX_TYPE, [0]) * (rows + 1)
+    size = 0
+    for row in range(rows):
+        unique = sorted(set(columns[counts[row]:counts[row + 1]]))
+        columns[size:size + len(unique)] = array(INDEX_TYPE, unique)
+        size += len(unique)
+        offsets[row + 1] = size
+    del columns[size:]
+
+    return offsets, columns
@@ -0,0 +1,226 @@
+"""
+Landmark distance index over the co-star graph.
+
+Usage: python landmarks.py directory [k]
+
+Breadth-first search from k high-degree landmark people gives each person's
+distance to every landmark. By the triangle inequality, those distances
+bound the separation of any pair in O(k), and the lower bound is a
+consistent A* heuristic for shortest_path. Running this module builds the
+index for a dataset and saves it next to the snapshot, where it is kept
+until a CSV file changes.
+"""
+
+import math
+import os
+import sys
+from array import array
+
+import degrees
+from snapshot import read_sections, write_sections
+
+INDEX_VERSION = 2
+INDEX_NAME = "landmarks.index"
+
+MAGIC = b"DEGLMK\0\0"
+
+# Distances fit comfortably in 16 bits; -1 marks an unreachable person
+DISTANCE_TYPE = "h"
+UNREACHABLE = -1
+
+
+class LandmarkIndex():
+    """
+    Distances from each landmark to every person in a Graph.
+
+    distances[i * n + p] is the number of hops from landmarks[i] to person
+    `p`, where n is the number of people, or UNREACHABLE. A loaded index
+    keeps distances as a memoryview over the mapped file.
+    """
+
+    def __init__(self, graph, landmarks, distances):
+        self.graph = graph
+        self.landmarks = landmarks
+        self.distances = distances
+
+    @classmethod
+    def build(cls, graph, k=16):
+        """
+        Picks the `k` people with the most co-star links as landmarks and
+        runs one breadth-first search from each.
+        """
+        n = graph.people_count()
+        reach = []
+        for person in range(n):
+            links = 0
+            for movie in graph.movies_of(person):
+                links += (graph.movie_offsets[movie + 1]
+                          - graph.movie_offsets[movie] - 1)
+            reach.append(links)
+        landmarks = sorted(range(n), key=lambda p: -reach[p])[:k]
+
+        distances = array(DISTANCE_TYPE)
+        for landmark in landmarks:
+            distances.extend(distances_from(graph, landmark))
+        return cls(graph, landmarks, distances)
+
+    def bounds(self, source, target):
+        """
+        Returns (lower, upper) bounds on the separation of the `source` and
+        `target` person ints. Either bound may be math.inf: a lower bound of
+        math.inf means the two people are not connected, and an upper bound
+        of math.inf means no landmark reaches them both.
+        """
+        if source == target:
+            return 0, 0
+        n = self.graph.people_count()
+        distances = self.distances
+        lower = 0
+        upper = math.inf
+        for i in range(len(self.landmarks)):
+            to_source = distances[i * n + source]
+            to_target = distances[i * n + target]
+            if to_source == UNREACHABLE and to_target == UNREACHABLE:
+                continue
+            if to_source == UNREACHABLE or to_target == UNREACHABLE:
+                return math.inf, math.inf
+            lower = max(lower, abs(to_source - to_target))
+            upper = min(upper, to_source + to_target)
+        return lower, upper
+
+    def within(self, source, target, hops):
+        """
+        Returns True if the `source` and `target` person ints are known to
+        be at most `hops` apart, False if they are known not to be, and
+        None if the landmarks cannot tell.
+        """
+        lower, upper = self.bounds(source, target)
+        if upper <= hops:
+            return True
+        if lower > hops:
+            return False
+        return None
+
+    def heuristic(self, target):
+        """
+        Returns a function giving a lower bound on the hops from a person
+        int to `target`, suitable as an A* heuristic.
+        """
+        n = self.graph.people_count()
+        distances = self.distances
+        columns = [
+            (i * n, distances[i * n + target])
+            for i in range(len(self.landmarks))
+        ]
+
+        def estimate(person):
+            bound = 0
+            for base, to_target in columns:
+                to_person = distances[base + person]
+                if to_person == UNREACHABLE and to_target == UNREACHABLE:
+                    continue
+                if to_person == UNREACHABLE or to_target == UNREACHABLE:
+                    return math.inf
+                bound = max(bound, abs(to_person - to_target))
+            return bound
+
+        return estimate
+
+    def save(self, directory):
+        """
+        Writes the index next to the dataset in `directory`, in the
+        snapshot layout.
+        """
+        header = {
+            "people": self.graph.people_count(),
+            "landmarks": [self.graph.person_ids[p] for p in self.landmarks]
+        }
+        write_sections(os.path.join(directory, INDEX_NAME), MAGIC,
+                       INDEX_VERSION, directory, header,
+                       {"distances": self.distances})
+
+    @classmethod
+    def load(cls, directory, graph):
+        """
+        Memory-maps the index saved for `directory`, or returns None if it
+        is missing, damaged or no longer matches the dataset.
+        """
+        loaded = read_sections(os.path.join(directory, INDEX_NAME), MAGIC,
+                               INDEX_VERSION, directory)
+        if loaded is None:
+            return None
+        header, sections = loaded
+
+        try:
+            landmarks = [graph.person_index[person_id]
+                         for person_id in header["landmarks"]]
+            distances = sections["distances"]
+        except KeyError:
+            return None
+        n = graph.people_count()
+        if (header.get("people") != n
+                or distances.format != DISTANCE_TYPE
+                or len(distances) != len(landmarks) * n):
+            return None
+        return cls(graph, landmarks, distances)
+
+
+def distances_from(graph, source):
+    """
+    Returns an array with the hops from the `source` person int to every
+    person in `graph`, or UNREACHABLE.
+    """
+    distances = array(DISTANCE_TYPE, [UNREACHABLE]) * graph.people_count()
+    distances[source] = 0
+    layer = [source]
+    depth = 0
+    while layer:
+        depth += 1
+        next_layer = []
+        for person in layer:
+            for _, neighbor in graph.neighbors(person):
+                if distances[neighbor] == UNREACHABLE:
+                    distances[neighbor] = depth
+                    next_layer.append(neighbor)
+        layer = next_layer
+    return distances
+
+
+def separation_bounds(index, source, target):
+    """
+    Returns (lower, upper) bounds on the degrees of separation between
+    the `source` and `target` person_ids.
+    """
+    person_index = index.graph.person_index
+    return index.bounds(person_index[source], person_index[target])
+
+
+def load_landmarks(directory, k=16):
+    """
+    Returns the landmark index for the dataset loaded from `directory`,
+    building and saving it first if needed.
+    """
+    index = LandmarkIndex.load(directory, degrees.graph)
+    if index is None:
+        index = LandmarkIndex.build(degrees.graph, k)
+        try:
+            index.save(directory)
+        except OSError:
+            pass
+    return index
+
+
+def main():
+    if len(sys.argv) not in (2, 3):
+        sys.exit("Usage: python landmarks.py directory [k]")
+    directory = sys.argv[1]
+    k = int(sys.argv[2]) if len(sys.argv) == 3 else 16
+
+    degrees.load_data(directory)
+    index = LandmarkIndex.build(degrees.graph, k)
+    index.save(directory)
+    print(f"Saved {len(index.landmarks)} landmarks to {directory}/{INDEX_NAME}")
+
+
+if __name__ == "__main__":
+    main()
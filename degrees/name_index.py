@@ -0,0 +1,292 @@
+"""
+Name index for looking people up by prefix or with typos.
+
+Names are normalized (accents stripped, lowercase, single spaces) and kept
+in sorted order for prefix search with bisect. A trigram index, stored
+CSR-style like the graph, finds names similar to a misspelled query. The
+index is saved next to the dataset snapshot in the same file layout.
+"""
+
+import sys
+import unicodedata
+from array import array
+from bisect import bisect_left
+
+import numpy as np
+
+from graph import INDEX_TYPE
+from snapshot import read_sections, write_sections
+
+INDEX_VERSION = 3
+INDEX_NAME = "names.index"
+MAGIC = b"DEGNAME\0"
+
+# Typos a fuzzy lookup is guaranteed to tolerate
+MAX_EDITS = 1
+
+
+class NameIndex():
+    """
+    keys[i] is the i-th normalized name in sorted order, key_lengths[i]
+    its length and order[i] the person int it belongs to; positions[p] is
+    the inverse. The people whose
+    names contain trigram_keys[t] are
+    trigram_people[trigram_offsets[t]:trigram_offsets[t + 1]], and
+    trigram_sizes[p] is the number of trigrams in person p's name.
+    """
+
+    def __init__(self, keys, key_lengths, order, positions, trigram_keys,
+                 trigram_offsets, trigram_people, trigram_sizes):
+        self.keys = keys
+        self.key_lengths = key_lengths
+        self.lengths = np.frombuffer(key_lengths, dtype=np.intc)
+        self.order = order
+        self.positions = positions
+        self.trigram_keys = trigram_keys
+        self.trigram_offsets = trigram_offsets
+        self.trigram_people = trigram_people
+        self.trigram_sizes = trigram_sizes
+        self.postings = np.frombuffer(trigram_people, dtype=np.intc)
+        self.sizes = np.frombuffer(trigram_sizes, dtype=np.intc)
+        self.trigram_slots = {
+            trigram: i for i, trigram in enumerate(trigram_keys)
+        }
+
+    @classmethod
+    def build(cls, names):
+        """
+        Builds the index from `names`, a list of names aligned with the
+        graph's person ints.
+        """
+        normalized = [normalize(name) for name in names]
+        order = array(INDEX_TYPE, sorted(range(len(names)),
+                                         key=normalized.__getitem__))
+        keys = [normalized[person] for person in order]
+        key_lengths = array(INDEX_TYPE, map(len, keys))
+        positions = array(INDEX_TYPE, [0]) * len(names)
+        for i, person in enumerate(order):
+            positions[person] = i
+
+        postings = {}
+        trigram_sizes = array(INDEX_TYPE)
+        for person, key in enumerate(normalized):
+            key_trigrams = trigrams(key)
+            trigram_sizes.append(len(key_trigrams))
+            for trigram in key_trigrams:
+                postings.setdefault(trigram, []).append(person)
+        trigram_keys = sorted(postings)
+        trigram_offsets = array(INDEX_TYPE, [0])
+        trigram_people = array(INDEX_TYPE)
+        for trigram in trigram_keys:
+            trigram_people.extend(postings[trigram])
+            trigram_offsets.append(len(trigram_people))
+
+        return cls(keys, key_lengths, order, positions, trigram_keys,
+                   trigram_offsets, trigram_people, trigram_sizes)
+
+    def save(self, directory):
+        write_sections(f"{directory}/{INDEX_NAME}", MAGIC, INDEX_VERSION,
+                       directory, {}, {
+                           "keys": self.keys,
+                           "key_lengths": self.key_lengths,
+                           "order": self.order,
+                           "positions": self.positions,
+                           "trigram_keys": self.trigram_keys,
+                           "trigram_offsets": self.trigram_offsets,
+                           "trigram_people": self.trigram_people,
+                           "trigram_sizes": self.trigram_sizes
+                       })
+
+    @classmethod
+    def load(cls, directory):
+        """
+        Maps the index saved for `directory`, or returns None if it is
+        missing or no longer matches the dataset.
+        """
+        loaded = read_sections(f"{directory}/{INDEX_NAME}", MAGIC,
+                               INDEX_VERSION, directory)
+        if loaded is None:
+            return None
+        _, sections = loaded
+        return cls(sections["keys"], sections["key_lengths"],
+                   sections["order"], sections["positions"],
+                   sections["trigram_keys"], sections["trigram_offsets"],
+                   sections["trigram_people"], sections["trigram_sizes"])
+
+    def exact(self, name):
+        """
+        Returns the person ints whose name normalizes to `name`.
+        """
+        key = normalize(name)
+        start = bisect_left(self.keys, key)
+        matches = []
+        for i in range(start, len(self.keys)):
+            if self.keys[i] != key:
+                break
+            matches.append(self.order[i])
+        return matches
+
+    def prefix(self, prefix, limit=10):
+        """
+        Returns up to `limit` person ints whose normalized name starts
+        with `prefix`, in name order.
+        """
+        key = normalize(prefix)
+        start = bisect_left(self.keys, key)
+        matches = []
+        for i in range(start, min(start + limit, len(self.keys))):
+            if not self.keys[i].startswith(key):
+                break
+            matches.append(self.order[i])
+        return matches
+
+    def shortest_prefixed(self, prefix, limit=10):
+        """
+        Returns up to `limit` person ints whose normalized name starts
+        with `prefix`, shortest names first and then in name order.
+        """
+        key = normalize(prefix)
+        start = bisect_left(self.keys, key)
+        end = bisect_left(self.keys, key + chr(sys.maxunicode), start)
+        lengths = self.lengths[start:end]
+        top = min(limit, end - start)
+        if top <= 0:
+            return []
+
+        # Every name shorter than the top-th shortest, then the first names
+        # of exactly that length
+        longest = np.partition(lengths, top - 1)[top - 1]
+        shorter = np.flatnonzero(lengths < longest)
+        tied = np.flatnonzero(lengths == longest)[:top - len(shorter)]
+        chosen = np.concatenate([shorter, tied])
+        chosen = chosen[np.lexsort((chosen, lengths[chosen]))]
+        return [self.order[start + i] for i in chosen.tolist()]
+
+    def similar(self, name, limit=10, edits=MAX_EDITS):
+        """
+        Returns up to `limit` (person, similarity) pairs for the names that
+        share the largest fraction of trigrams with `name`. Every name
+        within `edits` single-character edits of `name` is a candidate, and
+        if there are fewer than `limit` of those, the names sharing the
+        most trigrams fill in.
+        """
+        key = normalize(name)
+        query = trigrams(key)
+        slots = sorted(
+            (self.trigram_slots[trigram] for trigram in query
+             if trigram in self.trigram_slots),
+            key=lambda t: self.trigram_offsets[t + 1] - self.trigram_offsets[t]
+        )
+        if not slots or limit <= 0:
+            return []
+        lengths = [self.trigram_offsets[t + 1] - self.trigram_offsets[t]
+                   for t in slots]
+
+        # An edit changes at most three trigrams, so a name within `edits`
+        # edits shares at least `needed` of them with the query. A longest
+        # list that holds more postings than all the shorter ones together
+        # is skipped as long as such a name must still share a trigram
+        # with the lists that are scanned.
+        needed = len(query) - 3 * edits
+        skipped = 0
+        while (skipped < needed - 1
+               and lengths[-1 - skipped] > sum(lengths[:-1 - skipped])):
+            skipped += 1
+        least = max(needed - skipped, 1)
+
+        # Count shared trigrams over the scanned lists in full; each
+        # posting gets its person's count, and a person with count c has c
+        # postings, which gives the number of people with each count
+        postings = np.concatenate([
+            self.postings[self.trigram_offsets[t]:self.trigram_offsets[t + 1]]
+            for t in slots[:len(slots) - skipped]
+        ])
+        shared = np.bincount(postings)[postings]
+        people = np.bincount(shared)
+        people[1:] //= np.arange(1, len(people))
+
+        # Lower the bar to the largest count that `limit` people reach, and
+        # only take as many people at that count as are needed to fill in
+        reaching = np.cumsum(people[::-1])[::-1]
+        bar = min(least, max(np.flatnonzero(reaching >= limit), default=1))
+        if bar == least:
+            candidates, counts = np.unique(postings[shared >= bar],
+                                           return_counts=True)
+        else:
+            candidates, counts = np.unique(postings[shared > bar],
+                                           return_counts=True)
+            fill = np.unique(postings[shared == bar][:limit * bar])
+            fill = fill[:limit - len(candidates)]
+            candidates = np.concatenate([candidates, fill])
+            counts = np.concatenate([counts, np.full(len(fill), bar)])
+
+        # The counts give exact similarities unless lists were skipped,
+        # which may hold up to `skipped` more shared trigrams; names that
+        # could reach the top that way are scored from their trigrams
+        sizes = self.sizes[candidates]
+        scores = counts / (len(query) + sizes - counts)
+        most = np.minimum(counts + skipped, np.minimum(sizes, len(query)))
+        best = most / (len(query) + sizes - most)
+        top = min(limit, len(scores))
+        threshold = np.partition(scores, -top)[-top]
+        for i in np.flatnonzero((best > scores) & (best >= threshold)).tolist():
+            other = trigrams(self.keys[self.positions[candidates[i]]])
+            scores[i] = len(query & other) / len(query | other)
+
+        ranked = np.argsort(-scores, kind="stable")[:limit]
+        return [(int(candidates[i]), float(scores[i])) for i in ranked]
+
+    def search(self, name, limit=10):
+        """
+        Returns up to `limit` (person, score) pairs ranked by score, where
+        exact matches score 1, prefix matches score by how much of the name
+        the query covers, and other names score by trigram similarity.
+        """
+        key = normalize(name)
+        scores = {}
+        for person in self.exact(name):
+            scores[person] = 1.0
+        for person in self.shortest_prefixed(name, limit):
+            length = len(self.keys[self.positions[person]])
+            score = 0.5 + 0.5 * len(key) / length
+            scores[person] = max(scores.get(person, 0), score)
+        for person, similarity in self.similar(name, limit):
+            scores[person] = max(scores.get(person, 0), similarity)
+
+        ranked = sorted(scores.items(), key=lambda item: (
+            -item[1], self.keys[self.positions[item[0]]], item[0]
+        ))
+        return ranked[:limit]
+
+
+def normalize(name):
+    """
+    Lowercases `name`, strips accents and collapses whitespace.
+    """
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.lower().split())
+
+
+def trigrams(key):
+    """
+    Returns the set of trigrams of a normalized name, padded so that the
+    start and end of the name count too.
+    """
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def load_name_index(directory, names):
+    """
+    Returns the name index for the dataset in `directory`, building and
+    saving it first if needed. `names` is aligned with the person ints.
+    """
+    index = NameIndex.load(directory)
+    if index is None:
+        index = NameIndex.build(names)
+        try:
+            index.save(directory)
+        except OSError:
+            pass
+    return index
@@ -0,0 +1,165 @@
+"""
+Runs batch path queries on a pool of worker processes.
+
+Usage: python parallel.py directory [pairs] [--workers N]
+                          [--random N] [--seed S] [--scaling]
+
+Each worker memory-maps only the graph from the binary snapshot, so the
+graph arrays are shared through the page cache instead of being pickled
+to every process, and names and other fields are never loaded. Pairs are
+read as in batch.py, or generated at random with --random. With --scaling
+the whole batch is timed at 1, 2, 4, 8... workers and the throughput of
+each run is reported instead of the results; pool startup is timed
+separately and left out of the throughput.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed, wait
+
+import batch
+import degrees
+from snapshot import load_snapshot_graph
+
+
+def load_worker(directory):
+    """
+    Pool initializer: maps the snapshot graph into the worker, which is all
+    path queries need. Falls back to a full load if there is no snapshot.
+    """
+    graph = load_snapshot_graph(directory)
+    if graph is None:
+        degrees.load_data(directory)
+    else:
+        degrees.graph = graph
+
+
+def start_pool(directory, workers):
+    """
+    Returns a process pool of `workers` workers that have all finished
+    loading the graph.
+    """
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=load_worker,
+                                   initargs=(directory,))
+
+    # Workers are started as tasks are submitted, so one task per worker
+    # starts them all, and each one runs the initializer before its task
+    wait([executor.submit(os.getpid) for _ in range(workers)])
+    return executor
+
+
+def answer_groups(groups):
+    """
+    Answers a chunk of (source, queries) groups inside a worker and
+    returns the list of result records.
+    """
+    records = []
+    for source, queries in groups:
+        records.extend(batch.answer_group(source, queries))
+    return records
+
+
+def split_groups(groups, chunks):
+    """
+    Deals the (source, queries) items of `groups` round-robin into at most
+    `chunks` lists, largest groups first, so chunks get similar work.
+    """
+    items = sorted(groups.items(), key=lambda item: -len(item[1]))
+    parts = [[] for _ in range(min(chunks, len(items)))]
+    for i, item in enumerate(items):
+        parts[i % len(parts)].append(item)
+    return parts
+
+
+def run_parallel(directory, pairs, workers, executor=None):
+    """
+    Yields a result record for every (source, target) pair, answering the
+    source groups on `workers` processes, in `executor` if given or else
+    in a new pool. Records are yielded chunk by chunk as workers finish.
+    """
+    groups, errors = batch.group_by_source(pairs)
+    yield from errors
+    if not groups:
+        return
+
+    if executor is None:
+        with start_pool(directory, workers) as executor:
+            yield from run_parallel(directory, pairs, workers, executor)
+        return
+
+    futures = [executor.submit(answer_groups, chunk)
+               for chunk in split_groups(groups, workers * 4)]
+    for future in as_completed(futures):
+        yield from future.result()
+
+
+def scaling_report(directory, pairs, max_workers):
+    """
+    Times the whole batch at 1, 2, 4... up to `max_workers` processes, on
+    a pool started beforehand. Returns a list of (workers, startup
+    seconds, seconds, queries per second) tuples.
+    """
+    counts = []
+    workers = 1
+    while workers < max_workers:
+        counts.append(workers)
+        workers *= 2
+    counts.append(max_workers)
+
+    report = []
+    for workers in counts:
+        start = time.perf_counter()
+        with start_pool(directory, workers) as executor:
+            startup = time.perf_counter() - start
+            start = time.perf_counter()
+            for _ in run_parallel(directory, pairs, workers, executor):
+                pass
+            seconds = time.perf_counter() - start
+        report.append((workers, startup, seconds, len(pairs) / seconds))
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("directory")
+    parser.add_argument("pairs", nargs="?", default="-")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--random", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--scaling", action="store_true")
+    args = parser.parse_args()
+
+    # Loading in the parent writes the snapshot the workers will map
+    degrees.load_data(args.directory)
+
+    if args.random is not None:
+        rng = random.Random(args.seed)
+        person_ids = sorted(degrees.people)
+        pairs = [(rng.choice(person_ids), rng.choice(person_ids))
+                 for _ in range(args.random)]
+    elif args.pairs == "-":
+        pairs = batch.read_pairs(sys.stdin)
+    else:
+        with open(args.pairs, encoding="utf-8") as f:
+            pairs = batch.read_pairs(f)
+
+    if args.scaling:
+        report = scaling_report(args.directory, pairs, args.workers)
+        base = report[0][2]
+        print(f"Throughput for {len(pairs)} queries")
+        for workers, startup, seconds, throughput in report:
+            print(f"  {workers} workers: {seconds:.3f}s, "
+                  f"{throughput:.1f} queries/s, {base / seconds:.2f}x "
+                  f"(startup {startup:.3f}s)")
+        return
+
+    for record in run_parallel(args.directory, pairs, args.workers):
+        print(json.dumps(record), flush=True)
+
+
+if __name__ == "__main__":
+    main()
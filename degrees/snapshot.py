@@ -0,0 +1,214 @@
+"""
+Binary snapshot of the parsed degrees dataset.
+
+The snapshot is written next to the CSV files and is laid out so it can be
+memory-mapped: a fixed preamble, a JSON header, then 8-byte aligned
+sections holding either raw int arrays or NUL-separated UTF-8 strings.
+Int arrays are used in place through memoryviews over the mapping.
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from graph import Graph, INDEX_TYPE
+
+# Bump whenever the layout or the meaning of a section changes
+SNAPSHOT_VERSION = 1
+
+SNAPSHOT_NAME = "degrees.snapshot"
+SOURCE_NAMES = ("people.csv", "movies.csv", "stars.csv")
+
+MAGIC = b"DEGSNAP\0"
+PREAMBLE = struct.Struct("<8sII")
+ALIGNMENT = 8
+
+ARRAY_SECTIONS = ("person_offsets", "person_movies",
+                  "movie_offsets", "movie_people")
+PEOPLE_FIELDS = ("name", "birth")
+MOVIE_FIELDS = ("title", "year")
+
+
+def snapshot_path(directory):
+    return os.path.join(directory, SNAPSHOT_NAME)
+
+
+def source_fingerprint(directory):
+    """
+    Returns {filename: [mtime_ns, size]} for the dataset CSV files.
+    """
+    fingerprint = {}
+    for name in SOURCE_NAMES:
+        stat = os.stat(os.path.join(directory, name))
+        fingerprint[name] = [stat.st_mtime_ns, stat.st_size]
+    return fingerprint
+
+
+def save_snapshot(directory, graph, people_fields, movie_fields):
+    """
+    Writes `graph` and the people/movie field lists to the snapshot file.
+    """
+    sections = {}
+    for name in ARRAY_SECTIONS:
+        sections[name] = getattr(graph, name)
+    sections["person_ids"] = graph.person_ids
+    sections["movie_ids"] = graph.movie_ids
+    for field in PEOPLE_FIELDS:
+        sections[f"people.{field}"] = people_fields[field]
+    for field in MOVIE_FIELDS:
+        sections[f"movies.{field}"] = movie_fields[field]
+
+    write_sections(snapshot_path(directory), MAGIC, SNAPSHOT_VERSION,
+                   directory, {}, sections)
+
+
+def load_snapshot(directory):
+    """
+    Memory-maps the snapshot and returns (graph, people_fields,
+    movie_fields), or None if there is no snapshot, it was written by
+    another version or platform, or a CSV file changed since it was made.
+    """
+    loaded = read_sections(snapshot_path(directory), MAGIC, SNAPSHOT_VERSION,
+                           directory)
+    if loaded is None:
+        return None
+    _, sections = loaded
+
+    graph = Graph(sections["person_ids"], sections["movie_ids"],
+                  *(sections[name] for name in ARRAY_SECTIONS))
+    people_fields = {
+        field: sections[f"people.{field}"] for field in PEOPLE_FIELDS
+    }
+    movie_fields = {
+        field: sections[f"movies.{field}"] for field in MOVIE_FIELDS
+    }
+    return graph, people_fields, movie_fields
+
+
+def load_snapshot_graph(directory):
+    """
+    Memory-maps the snapshot and returns only its graph, without decoding
+    the people and movie fields, or None as load_snapshot does.
+    """
+    loaded = read_sections(snapshot_path(directory), MAGIC, SNAPSHOT_VERSION,
+                           directory,
+                           ("person_ids", "movie_ids") + ARRAY_SECTIONS)
+    if loaded is None:
+        return None
+    _, sections = loaded
+    return Graph(sections["person_ids"], sections["movie_ids"],
+                 *(sections[name] for name in ARRAY_SECTIONS))
+
+
+def write_sections(path, magic, version, directory, header, sections):
+    """
+    Writes a file in the snapshot layout. `sections` maps names to arrays
+    or lists of strings, and `header` holds extra JSON metadata. Arrays
+    whose typecode is not INDEX_TYPE keep it in the kind of the section,
+    as "array:<typecode>".
+    The file records the fingerprint of the dataset in `directory` and is
+    written under a temporary name and then moved into place, so readers
+    never see a partial file.
+    """
+    header = dict(header)
+    header["sources"] = source_fingerprint(directory)
+    header["byteorder"] = sys.byteorder
+    header["itemsize"] = array(INDEX_TYPE).itemsize
+    header["sections"] = {}
+
+    # Section offsets are relative to the end of the header
+    encoded = []
+    offset = 0
+    for name, values in sections.items():
+        if isinstance(values, (array, memoryview)):
+            typecode = (values.typecode if isinstance(values, array)
+                        else values.format)
+            kind = "array" if typecode == INDEX_TYPE else f"array:{typecode}"
+            data = bytes(values)
+        else:
+            kind = "strings"
+            data = "\0".join(values).encode("utf-8")
+        header["sections"][name] = [kind, offset, len(data), len(values)]
+        encoded.append(data)
+        offset = _align(offset + len(data))
+    header_bytes = json.dumps(header).encode("utf-8")
+    header_size = _align(PREAMBLE.size + len(header_bytes))
+
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "wb") as f:
+            f.write(PREAMBLE.pack(magic, version, len(header_bytes)))
+            f.write(header_bytes)
+            f.write(bytes(header_size - PREAMBLE.size - len(header_bytes)))
+            for data in encoded:
+                f.write(data)
+                f.write(bytes(_align(len(data)) - len(data)))
+        os.replace(temporary, path)
+    except BaseException:
+        # Leave no partial file behind, even when interrupted
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+        raise
+
+
+def read_sections(path, magic, version, directory, names=None):
+    """
+    Memory-maps a file written by write_sections and returns
+    (header, sections), with int arrays as memoryviews over the mapping.
+    If `names` is given, only those sections are read.
+    Returns None if the file is missing or truncated, has another magic
+    or version, was written on another platform, or the dataset in
+    `directory` changed since it was made.
+    """
+    try:
+        with open(path, "rb") as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        file_magic, file_version, header_length = PREAMBLE.unpack_from(mapping)
+        header_end = PREAMBLE.size + header_length
+        header = json.loads(mapping[PREAMBLE.size:header_end])
+        current = (file_magic == magic
+                   and file_version == version
+                   and header["sources"] == source_fingerprint(directory)
+                   and header["byteorder"] == sys.byteorder
+                   and header["itemsize"] == array(INDEX_TYPE).itemsize)
+    except (struct.error, ValueError, KeyError, OSError):
+        current = False
+    if not current:
+        mapping.close()
+        return None
+
+    base = _align(header_end)
+    if any(base + offset + length > len(mapping)
+           for _, offset, length, _ in header["sections"].values()):
+        mapping.close()
+        return None
+
+    view = memoryview(mapping)
+    sections = {}
+    for name, (kind, offset, length, count) in header["sections"].items():
+        if names is not None and name not in names:
+            continue
+        data = view[base + offset:base + offset + length]
+        if kind == "array":
+            sections[name] = data.cast(INDEX_TYPE)
+        elif kind.startswith("array:"):
+            sections[name] = data.cast(kind[len("array:"):])
+        elif count == 0:
+            sections[name] = []
+        else:
+            sections[name] = bytes(data).decode("utf-8").split("\0")
+    return header, sections
+
+
+def _align(size):
+    return (size + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
@@ -0,0 +1,214 @@
+"""
+Exact inference for heredity by message passing on a junction tree.
+
+Each person's gene count is a variable. It gets one factor: its
+unconditional probability, or for a child the probability of inheriting
+it from both parents, times the likelihood of the person's trait when
+that is known. Eliminating the variables in min-degree order gives one
+clique per variable (the variable and its neighbors at that point), and
+joining each clique to the clique of the first of its other variables to
+be eliminated gives a junction tree. A pass of messages towards the roots
+and one back out leave every clique with its joint distribution given the
+evidence, so every marginal comes from the same two passes.
+
+In a family without loops (no inbreeding or children with different
+partners) no clique is bigger than a child and its two parents, so the
+work grows linearly with the number of people, instead of the
+exponential enumeration in heredity.py.
+"""
+
+import heapq
+import itertools
+from collections import defaultdict
+
+from heredity import PROBS, parent_prob
+
+GENES = (0, 1, 2)
+
+
+class Factor():
+    """
+    Nonnegative values over assignments of gene counts to `variables`.
+    table maps every tuple of gene counts, in the order of `variables`,
+    to its value.
+    """
+
+    def __init__(self, variables, table):
+        self.variables = variables
+        self.table = table
+
+    def multiply(self, other):
+        variables = self.variables + tuple(
+            v for v in other.variables if v not in self.variables
+        )
+        own = [variables.index(v) for v in self.variables]
+        theirs = [variables.index(v) for v in other.variables]
+        table = {}
+        for genes in itertools.product(GENES, repeat=len(variables)):
+            table[genes] = (self.table[tuple(genes[i] for i in own)]
+                            * other.table[tuple(genes[i] for i in theirs)])
+        return Factor(variables, table)
+
+    def sum_out(self, keep):
+        """
+        Returns the factor over the variables in `keep` (in that order)
+        that sums this one over all other variables.
+        """
+        positions = [self.variables.index(v) for v in keep]
+        table = dict.fromkeys(itertools.product(GENES, repeat=len(keep)), 0)
+        for genes, value in self.table.items():
+            table[tuple(genes[i] for i in positions)] += value
+        return Factor(tuple(keep), table)
+
+    def divide(self, other):
+        """
+        Returns this factor divided entry by entry by a factor over the
+        same variables, taking 0 / 0 as 0.
+        """
+        table = {}
+        for genes, value in self.table.items():
+            divisor = other.table[genes]
+            table[genes] = value / divisor if divisor else 0
+        return Factor(self.variables, table)
+
+    def normalized(self):
+        """
+        Returns the factor scaled to sum to 1, or itself if it sums to 0.
+        """
+        total = sum(self.table.values())
+        if not total:
+            return self
+        return Factor(self.variables, {
+            genes: value / total for genes, value in self.table.items()
+        })
+
+
+def person_factor(people, person):
+    """
+    Returns the factor of `person`'s gene count, given their parents' if
+    they are known, times the likelihood of their trait if it is known.
+    """
+    trait = people[person]["trait"]
+
+    def likelihood(genes):
+        return 1 if trait is None else PROBS["trait"][genes][trait]
+
+    mother = people[person]["mother"]
+    father = people[person]["father"]
+    if mother is None:
+        return Factor((person,), {
+            (genes,): PROBS["gene"][genes] * likelihood(genes)
+            for genes in GENES
+        })
+
+    table = {}
+    for mother_genes, father_genes, genes in itertools.product(GENES, repeat=3):
+        from_mother = parent_prob(mother_genes)
+        from_father = parent_prob(father_genes)
+        inherit = {
+            0: (1 - from_mother) * (1 - from_father),
+            1: from_mother * (1 - from_father) + (1 - from_mother) * from_father,
+            2: from_mother * from_father
+        }[genes]
+        table[(mother_genes, father_genes, genes)] = inherit * likelihood(genes)
+    return Factor((mother, father, person), table)
+
+
+def elimination_cliques(factors):
+    """
+    Eliminates the variables of `factors` in min-degree order (ties by
+    name) and returns the list of cliques, each a tuple of the eliminated
+    variable followed by its neighbors at that point.
+    """
+    neighbors = defaultdict(set)
+    for factor in factors:
+        for variable in factor.variables:
+            neighbors[variable].update(factor.variables)
+            neighbors[variable].discard(variable)
+
+    heap = [(len(adjacent), variable) for variable, adjacent in neighbors.items()]
+    heapq.heapify(heap)
+    cliques = []
+    while heap:
+        degree, variable = heapq.heappop(heap)
+        if variable not in neighbors or degree != len(neighbors[variable]):
+            # Stale entry for a variable eliminated or changed since
+            continue
+
+        adjacent = neighbors.pop(variable)
+        cliques.append((variable,) + tuple(sorted(adjacent)))
+        for other in adjacent:
+            neighbors[other].discard(variable)
+            neighbors[other].update(adjacent - {other})
+            heapq.heappush(heap, (len(neighbors[other]), other))
+    return cliques
+
+
+def exact_probabilities(people):
+    """
+    Returns the same dict of normalized "gene" and "trait" distributions
+    for every person as the enumeration in heredity.py, computed on a
+    junction tree.
+    """
+    factors = [person_factor(people, person) for person in people]
+    cliques = elimination_cliques(factors)
+    position = {clique[0]: i for i, clique in enumerate(cliques)}
+
+    # Each clique hands its message to the clique of the first of its
+    # other variables to be eliminated, which comes later in the list
+    parent = [
+        min((position[v] for v in clique[1:]), default=None)
+        for clique in cliques
+    ]
+    children = defaultdict(list)
+    for i, j in enumerate(parent):
+        if j is not None:
+            children[j].append(i)
+
+    # Each factor goes to the clique of its first variable eliminated,
+    # which holds all of its variables
+    potentials = [Factor((), {(): 1}) for _ in cliques]
+    for factor in factors:
+        i = min(position[v] for v in factor.variables)
+        potentials[i] = potentials[i].multiply(factor)
+
+    # Collect towards the roots, in elimination order
+    upward = [None] * len(cliques)
+    for i, clique in enumerate(cliques):
+        belief = potentials[i]
+        for child in children[i]:
+            belief = belief.multiply(upward[child])
+        upward[i] = belief.sum_out(clique[1:]).normalized()
+
+    # Distribute from the roots back out; each belief is the clique's joint
+    # distribution up to a constant
+    beliefs = [None] * len(cliques)
+    downward = [None] * len(cliques)
+    for i in reversed(range(len(cliques))):
+        belief = potentials[i]
+        for child in children[i]:
+            belief = belief.multiply(upward[child])
+        if parent[i] is not None:
+            belief = belief.multiply(downward[i])
+        beliefs[i] = belief.normalized()
+        for child in children[i]:
+            separator = cliques[child][1:]
+            downward[child] = (beliefs[i].sum_out(separator)
+                               .divide(upward[child]).normalized())
+
+    probabilities = {}
+    for person in people:
+        genes = beliefs[position[person]].sum_out((person,)).normalized()
+        gene = {count: genes.table[(count,)] for count in (2, 1, 0)}
+        trait = people[person]["trait"]
+        if trait is None:
+            has_trait = sum(
+                gene[count] * PROBS["trait"][count][True] for count in GENES
+            )
+        else:
+            has_trait = 1 if trait else 0
+        probabilities[person] = {
+            "gene": gene,
+            "trait": {True: has_trait, False: 1 - has_trait}
+        }
+    return probabilities
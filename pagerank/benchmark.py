@@ -0,0 +1,144 @@
+"""
+Benchmarks crawling, graph building and PageRank on synthetic corpora.
+
+Usage: python benchmark.py [--sizes N [N ...]] [--directory DIR]
+                           [--samples N] [--seed S] [--output FILE]
+
+For every size, by default 10^2 to 10^6 pages, a power-law corpus is
+generated with generate.py, into a temporary directory or into DIR/N,
+where it is kept and reused by later runs. The 10^6 corpus is about a
+million files and takes most of the running time; pass --sizes to leave
+it out. Each implementation of every stage is run once for its time and
+once more under tracemalloc for its peak memory, and every ranking is
+compared by L1 error with a reference solved to a tolerance of 1e-13.
+Results are printed and, with --output, also written as JSON lines.
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+import crawler
+import generate
+import pagerank
+import solvers
+from graph import LinkGraph
+
+SIZES = [100, 1000, 10000, 100000, 1000000]
+REFERENCE_TOLERANCE = 1e-13
+
+
+def measure(function, *args):
+    """
+    Returns (result, seconds, peak bytes) of calling `function(*args)`:
+    timed on a first call, and traced by tracemalloc on a second one so
+    tracing does not slow down the timed call.
+    """
+    start = time.perf_counter()
+    result = function(*args)
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        function(*args)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return result, seconds, peak
+
+
+def corpus_benchmark(directory, samples, seed):
+    """
+    Runs every stage on the corpus in `directory` and returns a list of
+    record dicts with the stage, implementation, seconds, peak bytes and
+    L1 error against the reference ranks (None where there are no ranks).
+    """
+    records = []
+
+    def record(stage, implementation, seconds, peak, error=None, **extra):
+        records.append(dict(stage=stage, implementation=implementation,
+                            seconds=seconds, peak=peak, error=error, **extra))
+
+    corpus, seconds, peak = measure(pagerank.crawl, directory)
+    record("crawl", "crawl", seconds, peak)
+    graph, seconds, peak = measure(crawler.crawl_graph, directory)
+    record("crawl", "crawl_graph", seconds, peak)
+    _, seconds, peak = measure(LinkGraph.from_corpus, corpus)
+    record("build", "from_corpus", seconds, peak)
+
+    # Ranks are compared page by page in the order of the reference graph
+    reference, _ = solvers.solve(graph, pagerank.DAMPING, "jacobi",
+                                 REFERENCE_TOLERANCE)
+
+    def error(ranks):
+        return float(np.abs(
+            np.array([ranks[page] for page in graph.pages]) - reference
+        ).sum())
+
+    for name in solvers.SOLVERS:
+        (ranks, report), seconds, peak = measure(
+            solvers.solve, graph, pagerank.DAMPING, name
+        )
+        record("solve", name, seconds, peak,
+               error(graph.to_dict(ranks)), iterations=report["iterations"])
+
+    random.seed(seed)
+    ranks, seconds, peak = measure(pagerank.sample_pagerank, corpus,
+                                   pagerank.DAMPING, samples)
+    record("solve", "sample_pagerank", seconds, peak, error(ranks),
+           samples=samples)
+    return records
+
+
+def size_benchmark(root, size, args):
+    """
+    Runs corpus_benchmark on the corpus of `size` pages in root/size,
+    generating it first if it is not there.
+    """
+    directory = os.path.join(root, str(size))
+    if not os.path.isdir(directory):
+        generate.write_corpus(directory,
+                              generate.generate_links(size, seed=args.seed))
+    return corpus_benchmark(directory, args.samples, args.seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--directory", default=None)
+    parser.add_argument("--samples", type=int, default=10 * pagerank.SAMPLES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    output = open(args.output, "w") if args.output else None
+    try:
+        for size in args.sizes:
+            if args.directory is None:
+                with tempfile.TemporaryDirectory() as scratch:
+                    records = size_benchmark(scratch, size, args)
+            else:
+                records = size_benchmark(args.directory, size, args)
+
+            print(f"{size} pages")
+            for record in records:
+                error = ("" if record["error"] is None
+                         else f", L1 error {record['error']:.1e}")
+                print(f"  {record['stage']} {record['implementation']}: "
+                      f"{record['seconds']:.3f}s, "
+                      f"peak {record['peak'] / 2 ** 20:.1f} MiB{error}")
+                if output is not None:
+                    output.write(json.dumps(dict(pages=size, **record)) + "\n")
+    finally:
+        if output is not None:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
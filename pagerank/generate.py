@@ -0,0 +1,102 @@
+"""
+Generates synthetic HTML corpora with power-law link structure.
+
+Usage: python generate.py directory pages [--degree-exponent A]
+                          [--popularity-exponent B] [--dangling F]
+                          [--seed S]
+
+Out-degrees follow a Zipf distribution with exponent A, and link targets
+are drawn with probability proportional to r ** -B for a random
+popularity rank r, so a few pages get most of the links, as on the web. A
+fraction F of the pages has no links at all. Pages are named 0.html,
+1.html, ... and written in the same format as the course corpora.
+"""
+
+import argparse
+import os
+
+import numpy as np
+
+DEGREE_EXPONENT = 2.1
+POPULARITY_EXPONENT = 1.0
+DANGLING = 0.05
+MAX_LINKS = 1000
+
+PAGE = """<!DOCTYPE html>
+<html lang="en">
+    <head>
+        <title>{page}</title>
+    </head>
+    <body>
+        <h1>{page}</h1>
+
+        <div>Links:</div>
+        <ul>
+{links}        </ul>
+    </body>
+</html>
+"""
+LINK = """            <li><a href="{target}.html">{target}</a></li>
+"""
+
+
+def generate_links(pages, degree_exponent=DEGREE_EXPONENT,
+                   popularity_exponent=POPULARITY_EXPONENT,
+                   dangling=DANGLING, seed=0):
+    """
+    Returns a list with the sorted link targets of every page number.
+    """
+    rng = np.random.default_rng(seed)
+    degrees = np.minimum(rng.zipf(degree_exponent, pages),
+                         min(MAX_LINKS, pages - 1))
+    degrees[rng.random(pages) < dangling] = 0
+
+    popularity = np.arange(1, pages + 1, dtype=float) ** -popularity_exponent
+    popularity = rng.permutation(popularity / popularity.sum())
+    targets = rng.choice(pages, size=int(degrees.sum()), p=popularity)
+
+    links = []
+    offset = 0
+    for page, degree in enumerate(degrees):
+        chosen = set(targets[offset:offset + degree].tolist()) - {page}
+        links.append(sorted(chosen))
+        offset += degree
+    return links
+
+
+def write_corpus(directory, links):
+    """
+    Writes one HTML file per page of `links` into `directory`.
+    """
+    os.makedirs(directory, exist_ok=True)
+    for page, targets in enumerate(links):
+        html = PAGE.format(
+            page=page,
+            links="".join(LINK.format(target=target) for target in targets)
+        )
+        with open(os.path.join(directory, f"{page}.html"), "w") as f:
+            f.write(html)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("directory")
+    parser.add_argument("pages", type=int)
+    parser.add_argument("--degree-exponent", type=float, default=DEGREE_EXPONENT)
+    parser.add_argument("--popularity-exponent", type=float,
+                        default=POPULARITY_EXPONENT)
+    parser.add_argument("--dangling", type=float, default=DANGLING)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if args.pages < 2:
+        parser.error("a corpus needs at least 2 pages")
+
+    links = generate_links(args.pages, args.degree_exponent,
+                           args.popularity_exponent, args.dangling, args.seed)
+    write_corpus(args.directory, links)
+    print(f"Wrote {args.pages} pages with {sum(map(len, links))} links "
+          f"to {args.directory}")
+
+
+if __name__ == "__main__":
+    main()
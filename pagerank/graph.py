@@ -0,0 +1,101 @@
+"""
+Compact link graph for computing PageRank on large corpora.
+
+Pages are interned to dense ints and links stored CSR-style by target in
+NumPy arrays, so one step of the random surfer over every page is a single
+vectorized pass over the links instead of a loop over pairs of pages.
+"""
+
+import numpy as np
+
+# Type used for page ids; offsets use np.intp so they can exceed 2**31
+INDEX_TYPE = np.intc
+
+
+class LinkGraph():
+    """
+    Directed graph of links between pages.
+
+    The pages linking to page `t` are sources[offsets[t]:offsets[t + 1]],
+    in increasing order. out_degree[p] is the number of links on page `p`
+    and dangling marks the pages without any.
+    """
+
+    def __init__(self, pages, offsets, sources):
+        self.pages = pages
+        self.index = {page: i for i, page in enumerate(pages)}
+        self.offsets = offsets
+        self.sources = sources
+
+        # Target of every entry in sources
+        self.targets = np.repeat(np.arange(len(pages), dtype=INDEX_TYPE),
+                                 np.diff(offsets))
+        self.out_degree = np.bincount(sources, minlength=len(pages))
+        self.dangling = self.out_degree == 0
+        self.inverse_degree = np.zeros(len(pages))
+        np.divide(1.0, self.out_degree, out=self.inverse_degree,
+                  where=~self.dangling)
+
+    @classmethod
+    def from_edges(cls, pages, edge_sources, edge_targets):
+        """
+        Builds a graph from parallel sequences of (source, target) page
+        ints. Duplicate links and links from a page to itself are dropped,
+        as crawl does.
+        """
+        n = len(pages)
+        edge_sources = np.asarray(edge_sources, dtype=np.int64)
+        edge_targets = np.asarray(edge_targets, dtype=np.int64)
+
+        # Sorting by target * n + source groups the links by target, and
+        # np.unique drops the repeated ones on the way
+        keys = edge_targets * n + edge_sources
+        keys = np.unique(keys[edge_sources != edge_targets])
+        targets, sources = np.divmod(keys, max(n, 1))
+
+        offsets = np.zeros(n + 1, dtype=np.intp)
+        np.cumsum(np.bincount(targets, minlength=n), out=offsets[1:])
+        return cls(list(pages), offsets, sources.astype(INDEX_TYPE))
+
+    @classmethod
+    def from_corpus(cls, corpus):
+        """
+        Builds a graph from a corpus dict as returned by crawl.
+        """
+        pages = list(corpus)
+        index = {page: i for i, page in enumerate(pages)}
+        edge_sources = []
+        edge_targets = []
+        for page, links in corpus.items():
+            for link in links:
+                edge_sources.append(index[page])
+                edge_targets.append(index[link])
+        return cls.from_edges(pages, edge_sources, edge_targets)
+
+    def page_count(self):
+        return len(self.pages)
+
+    def link_count(self):
+        return len(self.sources)
+
+    def propagate(self, ranks):
+        """
+        Returns the rank every page receives along links when each page
+        splits its rank evenly over its links. Dangling pages pass nothing.
+        `ranks` may also be a 2-D array with one rank vector per row.
+        """
+        # Row by row: one bincount over the flattened rows, or reduceat
+        # over the rows transposed, allocate a copy per link and row and
+        # measured two to three times slower
+        if ranks.ndim == 2:
+            return np.stack([self.propagate(row) for row in ranks])
+
+        weights = (ranks * self.inverse_degree)[self.sources]
+        return np.bincount(self.targets, weights=weights,
+                           minlength=len(self.pages))
+
+    def to_dict(self, ranks):
+        """
+        Returns a dict from page name to its value in `ranks`.
+        """
+        return {page: float(rank) for page, rank in zip(self.pages, ranks)}
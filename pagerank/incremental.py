@@ -0,0 +1,122 @@
+"""
+Incremental PageRank: updates previous ranks after the link graph changes.
+
+A dangling page spreads its rank the same way as teleporting, so PageRank
+is the normalized solution y of y = (1 - d) / N + d * L y, where L only
+follows real links and dangling pages pass nothing on. The previous ranks
+scaled to that system solve it for the old graph, so after a change the
+residual b + d * L y - y is only nonzero around the pages whose links
+changed. Gauss-Southwell pushes (largest residual first) then move it into
+the estimates and along links until every residual is within the
+tolerance, touching only the part of the graph the change reaches.
+"""
+
+import heapq
+from collections import defaultdict
+
+# Pages are pushed until no residual is above TOLERANCE / N, that fraction
+# of the average rank. The L1 error of the result is at most the sum of the
+# residuals left over divided by 1 - damping.
+TOLERANCE = 1e-3
+
+
+def diff_corpus(old_corpus, corpus):
+    """
+    Returns (added_links, removed_links): the sets of (source, target)
+    links in `corpus` but not in `old_corpus`, and the other way round.
+    Links of pages that were added or removed are included.
+    """
+    added_links = set()
+    removed_links = set()
+    for page in old_corpus.keys() | corpus.keys():
+        old_links = old_corpus.get(page, set())
+        links = corpus.get(page, set())
+        added_links.update((page, link) for link in links - old_links)
+        removed_links.update((page, link) for link in old_links - links)
+    return added_links, removed_links
+
+
+def update_pagerank(corpus, ranks, damping_factor, added_links, removed_links,
+                    tolerance=TOLERANCE, stats=None):
+    """
+    Returns the PageRank of every page in `corpus`, given the `ranks`
+    computed before `added_links` were added and `removed_links` removed
+    (as returned by diff_corpus). Pages in `corpus` but not in `ranks` are
+    new, and pages in `ranks` but not in `corpus` were removed; the links
+    of both must be part of the changes.
+
+    If `stats` is a dict, "pushes" is set to the number of pages pushed.
+    """
+    d = damping_factor
+    n = len(corpus)
+    threshold = tolerance / max(n, 1)
+    added = defaultdict(set)
+    removed = defaultdict(set)
+    for source, target in added_links:
+        added[source].add(target)
+    for source, target in removed_links:
+        removed[source].add(target)
+    changed = added.keys() | removed.keys()
+
+    def old_links(page):
+        links = corpus.get(page, set())
+        if page in changed:
+            links = (links - added.get(page, set())) | removed.get(page, set())
+        return links
+
+    if n == 0:
+        return {}
+
+    # The old ranks sum to 1, while the old y sums to (1 - d) plus d times
+    # the y of pages with links; moving from N to n pages scales y by N / n
+    dangling = sum(rank for page, rank in ranks.items() if not old_links(page))
+    scale = (1 - d) / (1 - d * (1 - dangling)) * len(ranks) / n
+    estimates = {page: ranks.get(page, 0) * scale for page in corpus}
+
+    # Residuals of the new system: teleporting into new pages, and the rank
+    # of every changed page moving from its old links to its new ones
+    residuals = defaultdict(float)
+    for page in corpus:
+        if page not in ranks:
+            residuals[page] += (1 - d) / n
+    for page in changed:
+        if page not in ranks:
+            continue
+        weight = d * ranks[page] * scale
+        links = old_links(page)
+        for link in links:
+            if link in corpus:
+                residuals[link] -= weight / len(links)
+        links = corpus.get(page, set())
+        for link in links:
+            residuals[link] += weight / len(links)
+
+    heap = [(-abs(residual), page) for page, residual in residuals.items()
+            if abs(residual) > threshold]
+    heapq.heapify(heap)
+    pushes = 0
+    while heap:
+        _, page = heapq.heappop(heap)
+        residual = residuals[page]
+        if abs(residual) <= threshold:
+            # Stale entry for a page pushed since
+            continue
+
+        pushes += 1
+        residuals[page] = 0
+        estimates[page] += residual
+        links = corpus[page]
+        if not links:
+            continue
+        share = d * residual / len(links)
+        for link in links:
+            residual = residuals[link] + share
+            residuals[link] = residual
+            if abs(residual) > threshold:
+                heapq.heappush(heap, (-abs(residual), link))
+
+    if stats is not None:
+        stats["pushes"] = pushes
+
+    total = sum(estimates.values())
+    return {page: estimate / total for page, estimate in estimates.items()}
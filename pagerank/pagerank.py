@@ -3,6 +3,10 @@ import random
 import re
 import sys
 
+from graph import LinkGraph
+from sampling import RandomSurfer
+from solvers import MAX_ITERATIONS, TOLERANCE, solve
+
 DAMPING = 0.85
 SAMPLES = 10000
 
@@ -89,33 +93,24 @@ def sample_pagerank(corpus, damping_factor, num_samples):
     seus valores estimados de PageRank (um valor entre 0 e 1). Todos os valores
     de PageRank devem somar 1.
     """
-    rank_counts = {}
-    # Inicializa o contador de visitas de todas as páginas como 0
-    for page in corpus:
-        rank_counts[page] = 0
-
-    # Escolhe uma página inicial aleatória
-    current_page = random.choice(list(corpus.keys()))
+    # Pré-computa o modelo de transição de cada página uma única vez, para
+    # que cada passo da amostragem custe O(1)
+    surfer = RandomSurfer.from_corpus(corpus, damping_factor)
 
-    # Realiza a amostragem `num_samples` vezes
-    for _ in range(num_samples):
-        rank_counts[current_page] += 1  # Incrementa o contador da página atual
-        transition_probs = transition_model(corpus, current_page, damping_factor)  # Obtém o modelo de transição
-
-        # Escolhe a próxima página com base nas probabilidades do modelo de transição
-        pages = list(transition_probs.keys())
-        weights = list(transition_probs.values())
-        current_page = random.choices(pages, weights)[0]
+    # Escolhe uma página inicial aleatória e realiza a amostragem
+    current_page = random.randrange(len(surfer.pages))
+    rank_counts = surfer.walk(current_page, num_samples)
 
     # Normaliza os valores de PageRank para que a soma seja 1
     normalized_ranks = {}
-    for page in rank_counts:
-        normalized_ranks[page] = rank_counts[page] / num_samples
+    for page, count in zip(surfer.pages, rank_counts):
+        normalized_ranks[page] = count / num_samples
 
     return normalized_ranks
 
 
-def iterate_pagerank(corpus, damping_factor):
+def iterate_pagerank(corpus, damping_factor, solver="jacobi", tolerance=TOLERANCE,
+                     norm="l1", max_iterations=MAX_ITERATIONS, stats=None):
     """
     Retorna os valores de PageRank para cada página atualizando iterativamente
     os valores de PageRank até a convergência.
@@ -123,45 +118,20 @@ def iterate_pagerank(corpus, damping_factor):
     Retorna um dicionário onde as chaves são os nomes das páginas e os valores são
     seus valores estimados de PageRank (um valor entre 0 e 1). Todos os valores
     de PageRank devem somar 1.
+
+    `solver` é um dos métodos de solvers.SOLVERS, que para quando iterações
+    sucessivas diferem menos que `tolerance` na norma `norm`, ou após
+    `max_iterations` iterações. Se `stats` for um dicionário, recebe o
+    relatório do solver (iterações, resíduos, se convergiu e tempo).
     """
-    ranks = {}
-    total_pages = len(corpus)
-    # Inicializa o PageRank de todas as páginas com o mesmo valor (1 / número de páginas)
-    for page in corpus:
-        ranks[page] = 1 / total_pages
-
-    convergence_threshold = 0.001  # Limiar de convergência para determinar quando parar as iterações
-    updated_ranks = ranks.copy()  # Cria uma cópia para armazenar os novos valores
-
-    while True:
-        for target_page in corpus:
-            # Calcula a contribuição base (1 - damping_factor) distribuída igualmente
-            rank_sum = (1 - damping_factor) / total_pages
-            # Calcula a contribuição dos links de outras páginas
-            for source_page in corpus:
-                if target_page in corpus[source_page]:  # Se a página atual é linkada por outra página `source_page`
-                    rank_sum += damping_factor * (ranks[source_page] / len(corpus[source_page]))
-                if not corpus[source_page]:  # Se a página `source_page` não tem links, considera todas as páginas
-                    rank_sum += damping_factor * (ranks[source_page] / total_pages)
-            updated_ranks[target_page] = rank_sum  # Atualiza o novo valor de PageRank
-
-        # Verifica se a convergência foi atingida
-        has_converged = True
-        for page in ranks:
-            if abs(updated_ranks[page] - ranks[page]) >= convergence_threshold:
-                has_converged = False
-                break
-        if has_converged:
-            break  # Se convergiu, sai do loop
-        else:
-            ranks = updated_ranks.copy()  # Atualiza os valores de PageRank para a próxima iteração
-
-    # Normaliza os resultados para garantir que a soma seja exatamente 1
-    rank_total = sum(updated_ranks.values())
-    for page in updated_ranks:
-        updated_ranks[page] /= rank_total
-
-    return updated_ranks
+    # Monta a matriz esparsa de links (CSR) uma vez; cada iteração é então
+    # uma única passada vetorizada pelos links, em vez de O(N²) pares de páginas
+    graph = LinkGraph.from_corpus(corpus)
+    ranks, report = solve(graph, damping_factor, solver, tolerance, norm,
+                          max_iterations)
+    if stats is not None:
+        stats.update(report)
+    return graph.to_dict(ranks)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,122 @@
+"""
+Estimates PageRank with many independent random walks on worker processes.
+
+Usage: python parallel.py corpus [--walkers N] [--steps N]
+                          [--workers N] [--seed S]
+
+Every walker starts from a teleport page and takes `steps` steps with its
+own RNG, seeded from the master seed and the walker's number, so the
+result only depends on the seed and not on how walkers are spread over
+processes. Workers return integer sums of the visit counts and of their
+squares, which merge exactly; the spread of the walkers' estimates gives
+the standard error reported next to each rank.
+"""
+
+import argparse
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pagerank
+from sampling import RandomSurfer
+
+surfer = None
+
+
+def load_worker(shared_surfer):
+    """
+    Pool initializer: keeps the surfer sent once to every worker.
+    """
+    global surfer
+    surfer = shared_surfer
+
+
+def walker_rng(seed, walker):
+    """
+    Returns the RNG of walker number `walker` for a master `seed`.
+    """
+    return random.Random(f"{seed}/{walker}")
+
+
+def run_walkers(walkers, steps, seed):
+    """
+    Runs the walkers numbered in `walkers` on the worker's surfer.
+    Returns (totals, squares): per page, the sum over walkers of its visit
+    count and of the count squared.
+    """
+    totals = [0] * len(surfer.pages)
+    squares = [0] * len(surfer.pages)
+    for walker in walkers:
+        rng = walker_rng(seed, walker)
+        counts = surfer.walk(surfer.teleport.sample(rng), steps, rng)
+        for page, count in enumerate(counts):
+            if count:
+                totals[page] += count
+                squares[page] += count * count
+    return totals, squares
+
+
+def parallel_pagerank(surfer, walkers, steps, workers, seed=0):
+    """
+    Runs `walkers` walks of `steps` steps on `workers` processes.
+    Returns (ranks, errors): dicts from page to its estimated PageRank and
+    to the standard error of that estimate (None with a single walker).
+    """
+    chunks = [range(start, walkers, workers * 4)
+              for start in range(min(walkers, workers * 4))]
+    totals = [0] * len(surfer.pages)
+    squares = [0] * len(surfer.pages)
+    with ProcessPoolExecutor(max_workers=workers, initializer=load_worker,
+                             initargs=(surfer,)) as executor:
+        futures = [executor.submit(run_walkers, chunk, steps, seed)
+                   for chunk in chunks]
+        for future in futures:
+            chunk_totals, chunk_squares = future.result()
+            for page in range(len(surfer.pages)):
+                totals[page] += chunk_totals[page]
+                squares[page] += chunk_squares[page]
+
+    ranks = {}
+    errors = {}
+    for page, name in enumerate(surfer.pages):
+        ranks[name] = totals[page] / (walkers * steps)
+        if walkers < 2:
+            errors[name] = None
+            continue
+
+        # Sample variance of the walkers' estimates count / steps, divided
+        # by the number of walkers for the variance of their mean
+        variance = ((squares[page] - totals[page] ** 2 / walkers)
+                    / (walkers - 1) / steps ** 2)
+        errors[name] = math.sqrt(max(variance, 0) / walkers)
+    return ranks, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("corpus")
+    parser.add_argument("--walkers", type=int, default=100)
+    parser.add_argument("--steps", type=int, default=pagerank.SAMPLES)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    corpus = pagerank.crawl(args.corpus)
+    surfer = RandomSurfer.from_corpus(corpus, pagerank.DAMPING)
+
+    start = time.perf_counter()
+    ranks, errors = parallel_pagerank(surfer, args.walkers, args.steps,
+                                      args.workers, args.seed)
+    seconds = time.perf_counter() - start
+
+    print(f"PageRank Results from {args.walkers} walkers of {args.steps} "
+          f"steps on {args.workers} processes ({seconds:.2f}s)")
+    for page in sorted(ranks):
+        error = "" if errors[page] is None else f" ± {errors[page]:.4f}"
+        print(f"  {page}: {ranks[page]:.4f}{error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Constant-time random surfer for estimating PageRank by sampling.
+
+The transition model of a page is a mixture: with probability `damping`
+follow one of its links chosen uniformly, otherwise teleport to a page
+drawn from the teleport distribution (dangling pages always teleport).
+Both parts are precomputed once, so every step of a walk costs O(1)
+instead of rebuilding the distribution over the whole corpus.
+"""
+
+import random
+
+
+class AliasTable():
+    """
+    Walker's alias method: after O(n) setup (Vose's construction), draws
+    index `i` with probability weights[i] / sum(weights) using one random
+    number. Slot `i` keeps itself with probability prob[i] and otherwise
+    gives alias[i].
+    """
+
+    def __init__(self, weights):
+        n = len(weights)
+        total = sum(weights)
+        if n == 0 or total <= 0:
+            raise ValueError("weights must contain a positive value")
+
+        scaled = [w * n / total for w in weights]
+        self.prob = [1.0] * n
+        self.alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1]
+        large = [i for i, p in enumerate(scaled) if p >= 1]
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            self.prob[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] -= 1 - scaled[less]
+            if scaled[more] < 1:
+                small.append(more)
+            else:
+                large.append(more)
+
+        # Whatever is left is 1 up to rounding and keeps its own slot
+
+    def __len__(self):
+        return len(self.prob)
+
+    def sample(self, rng=random):
+        u = rng.random() * len(self.prob)
+        i = int(u)
+        return i if u - i < self.prob[i] else self.alias[i]
+
+
+class RandomSurfer():
+    """
+    Random surfer over pages numbered 0..n-1, where links[p] lists the
+    pages page `p` links to. Teleports are drawn from `teleport` weights,
+    uniform when not given.
+    """
+
+    def __init__(self, pages, links, damping_factor, teleport=None):
+        self.pages = pages
+        self.links = links
+        self.damping_factor = damping_factor
+        self.teleport = AliasTable(
+            [1] * len(pages) if teleport is None else teleport
+        )
+
+    @classmethod
+    def from_corpus(cls, corpus, damping_factor, teleport=None):
+        """
+        Builds a surfer from a corpus dict as returned by crawl.
+        `teleport`, if given, maps pages to their teleport weight.
+        """
+        pages = list(corpus)
+        index = {page: i for i, page in enumerate(pages)}
+        # Sorted so walks do not depend on the hash order of the link sets
+        links = [sorted(index[link] for link in corpus[page]) for page in pages]
+        if teleport is not None:
+            teleport = [teleport.get(page, 0) for page in pages]
+        return cls(pages, links, damping_factor, teleport)
+
+    def step(self, page, rng=random):
+        """
+        Returns the page visited after `page`.
+        """
+        links = self.links[page]
+        if links and rng.random() < self.damping_factor:
+            # An alias table over equal weights is just an index
+            return links[int(rng.random() * len(links))]
+        return self.teleport.sample(rng)
+
+    def walk(self, start, steps, rng=random):
+        """
+        Returns a list with the number of times each page is visited by a
+        walk of `steps` pages beginning at `start`.
+        """
+        counts = [0] * len(self.pages)
+        page = start
+        for _ in range(steps):
+            counts[page] += 1
+            page = self.step(page, rng)
+        return counts
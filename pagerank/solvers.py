@@ -0,0 +1,238 @@
+"""
+Iterative solvers for PageRank on a LinkGraph, with convergence reports.
+
+Usage: python solvers.py corpus [--solver NAME] [--tolerance T]
+                         [--norm l1|l2|max] [--max-iterations N]
+
+Every solver starts from uniform ranks and stops once successive rank
+vectors are within `tolerance` in the chosen norm, or after
+`max_iterations` iterations, since a tolerance near machine precision may
+never be reached. Each returns the ranks and a report dict with the
+number of iterations, the residual (that distance) of every iteration,
+whether the tolerance was reached and the seconds taken. Run as a script
+it compares the solvers on a corpus.
+
+- jacobi: the power method. The rank of dangling pages is spread as a
+  rank-one uniform term instead of being stored as links.
+- gauss-seidel: solves y = (1 - d) / N + d * L y, where L follows only
+  real links, whose normalized solution is PageRank. Pages are updated in
+  blocks, and each block already uses the new values of earlier ones.
+- aitken, quadratic: the power method, with every EXTRAPOLATION_PERIOD
+  iterations an Aitken delta-squared step on each page, or the quadratic
+  extrapolation of Kamvar et al. fitted to the last four iterates.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+# Largest distance between successive rank vectors at which iteration stops
+TOLERANCE = 1e-10
+
+# Iterations after which a solver gives up on reaching the tolerance
+MAX_ITERATIONS = 1000
+
+NORMS = {
+    "l1": lambda v: np.abs(v).sum(),
+    "l2": lambda v: np.sqrt(np.dot(v, v)),
+    "max": lambda v: np.abs(v).max(initial=0)
+}
+
+# Pages updated together by one step of gauss-seidel
+BLOCKS = 64
+
+# Power iterations between extrapolations
+EXTRAPOLATION_PERIOD = 10
+
+
+def google_step(graph, ranks, damping_factor):
+    """
+    Returns one power-method step from `ranks`: rank flows along links,
+    dangling pages spread theirs over every page, and 1 - damping of all
+    of it teleports uniformly.
+    """
+    n = graph.page_count()
+    leaked = ranks[graph.dangling].sum()
+    updated = damping_factor * graph.propagate(ranks)
+    updated += ((1 - damping_factor) * ranks.sum()
+                + damping_factor * leaked) / n
+    return updated
+
+
+def iterate(graph, damping_factor, tolerance, norm, max_iterations,
+            extrapolate=None):
+    """
+    Runs the power method until the residual is below `tolerance` or for
+    `max_iterations` iterations, calling
+    `extrapolate(history)` with the last iterates every
+    EXTRAPOLATION_PERIOD iterations to replace the current one.
+    Returns (ranks, residuals).
+    """
+    distance = NORMS[norm]
+    n = graph.page_count()
+    ranks = np.full(n, 1 / n)
+    history = [ranks]
+    residuals = []
+    while True:
+        updated = google_step(graph, ranks, damping_factor)
+        residuals.append(distance(updated - ranks))
+        ranks = updated
+        if residuals[-1] < tolerance or len(residuals) >= max_iterations:
+            break
+
+        history = history[-3:] + [ranks]
+        if (extrapolate is not None
+                and len(residuals) % EXTRAPOLATION_PERIOD == 0):
+            ranks = extrapolate(history)
+            ranks = np.maximum(ranks, 0)
+            ranks /= ranks.sum()
+            history = [ranks]
+    return ranks, residuals
+
+
+def jacobi(graph, damping_factor, tolerance=TOLERANCE, norm="l1",
+           max_iterations=MAX_ITERATIONS):
+    return iterate(graph, damping_factor, tolerance, norm, max_iterations)
+
+
+def aitken(graph, damping_factor, tolerance=TOLERANCE, norm="l1",
+           max_iterations=MAX_ITERATIONS):
+    def extrapolate(history):
+        x0, x1, x2 = history[-3:]
+        step = x2 - x1
+        curvature = x2 - 2 * x1 + x0
+
+        # Pages whose differences are not shrinking geometrically keep x2
+        usable = np.abs(curvature) > 1e-15
+        extrapolated = x2.copy()
+        extrapolated[usable] -= step[usable] ** 2 / curvature[usable]
+        return extrapolated
+    return iterate(graph, damping_factor, tolerance, norm, max_iterations,
+                   extrapolate)
+
+
+def quadratic(graph, damping_factor, tolerance=TOLERANCE, norm="l1",
+              max_iterations=MAX_ITERATIONS):
+    def extrapolate(history):
+        if len(history) < 4:
+            return history[-1]
+
+        # Fit the last iterates to the stationary vector plus the two
+        # slowest error terms, then cancel those terms
+        x0, x1, x2, x3 = history[-4:]
+        differences = np.stack([x1 - x0, x2 - x0], axis=1)
+        (g1, g2), *_ = np.linalg.lstsq(differences, -(x3 - x0), rcond=None)
+        g3 = 1
+        return (g1 + g2 + g3) * x1 + (g2 + g3) * x2 + g3 * x3
+    return iterate(graph, damping_factor, tolerance, norm, max_iterations,
+                   extrapolate)
+
+
+def gauss_seidel(graph, damping_factor, tolerance=TOLERANCE, norm="l1",
+                 max_iterations=MAX_ITERATIONS, blocks=BLOCKS):
+    d = damping_factor
+    distance = NORMS[norm]
+    n = graph.page_count()
+    bounds = np.linspace(0, n, min(blocks, n) + 1).astype(np.intp)
+
+    y = np.full(n, 1 / n)
+    weights = y * graph.inverse_degree
+    ranks = y / y.sum()
+    residuals = []
+    while True:
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            # The links into a block of targets are contiguous in sources
+            first, last = graph.offsets[start], graph.offsets[end]
+            received = np.bincount(
+                graph.targets[first:last] - start,
+                weights=weights[graph.sources[first:last]],
+                minlength=end - start
+            )
+            y[start:end] = (1 - d) / n + d * received
+            weights[start:end] = y[start:end] * graph.inverse_degree[start:end]
+
+        updated = y / y.sum()
+        residuals.append(distance(updated - ranks))
+        ranks = updated
+        if residuals[-1] < tolerance or len(residuals) >= max_iterations:
+            break
+    return ranks, residuals
+
+
+SOLVERS = {
+    "jacobi": jacobi,
+    "gauss-seidel": gauss_seidel,
+    "aitken": aitken,
+    "quadratic": quadratic
+}
+
+
+def solve(graph, damping_factor, solver="jacobi", tolerance=TOLERANCE,
+          norm="l1", max_iterations=MAX_ITERATIONS):
+    """
+    Returns (ranks, report) for a LinkGraph using the named solver. The
+    report has the solver name, the number of iterations, the residual of
+    each iteration, whether the last residual is below `tolerance` and the
+    seconds taken.
+    """
+    if solver not in SOLVERS:
+        raise ValueError(f"unknown solver {solver}")
+    if norm not in NORMS:
+        raise ValueError(f"unknown norm {norm}")
+    if max_iterations < 1:
+        raise ValueError("max_iterations must be at least 1")
+
+    start = time.perf_counter()
+    if graph.page_count() == 0:
+        ranks, residuals = np.zeros(0), []
+    else:
+        ranks, residuals = SOLVERS[solver](graph, damping_factor,
+                                           tolerance, norm, max_iterations)
+    report = {
+        "solver": solver,
+        "iterations": len(residuals),
+        "residuals": residuals,
+        "converged": not residuals or residuals[-1] < tolerance,
+        "seconds": time.perf_counter() - start
+    }
+    return ranks, report
+
+
+def power_iteration(graph, damping_factor, tolerance=TOLERANCE):
+    """
+    Returns the PageRank vector of `graph` found by the power method.
+    """
+    return solve(graph, damping_factor, "jacobi", tolerance)[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("corpus")
+    parser.add_argument("--solver", choices=SOLVERS, action="append")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--norm", choices=NORMS, default="l1")
+    parser.add_argument("--max-iterations", type=int, default=MAX_ITERATIONS)
+    args = parser.parse_args()
+
+    # Imported here because both of them import this module
+    import crawler
+    import pagerank
+
+    graph = crawler.crawl_graph(args.corpus)
+    reference, _ = solve(graph, pagerank.DAMPING, "jacobi", 1e-14, "l1")
+    print(f"{graph.page_count()} pages, {graph.link_count()} links, "
+          f"tolerance {args.tolerance:g} in {args.norm}")
+    for solver in args.solver or SOLVERS:
+        ranks, report = solve(graph, pagerank.DAMPING, solver,
+                              args.tolerance, args.norm, args.max_iterations)
+        error = np.abs(ranks - reference).sum()
+        curve = " ".join(f"{r:.0e}" for r in report["residuals"])
+        stopped = "" if report["converged"] else " (not converged)"
+        print(f"  {solver}: {report['iterations']} iterations{stopped}, "
+              f"{report['seconds'] * 1000:.1f} ms, L1 error {error:.1e}")
+        print(f"    residuals: {curve}")
+
+
+if __name__ == "__main__":
+    main()
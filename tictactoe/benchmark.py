@@ -0,0 +1,124 @@
+"""
+Benchmarks the tic-tac-toe searches on every reachable position.
+
+Usage: python benchmark.py [--plain]
+
+Each solver picks a move for every reachable non-terminal position with
+empty tables, so the numbers are the cost of one cold move. Every move is
+checked to be optimal. The original exhaustive minimax (min_value and
+max_value) takes minutes and only runs with --plain.
+"""
+
+import argparse
+import time
+
+import bitboard
+import tictactoe as ttt
+
+
+def reachable_positions():
+    """
+    Returns every non-terminal board reachable from the initial state.
+    """
+    positions = {}
+    stack = [ttt.initial_state()]
+    while stack:
+        board = stack.pop()
+        key = ttt.to_masks(board)
+        if key in positions or ttt.terminal(board):
+            continue
+        positions[key] = board
+        for action in ttt.actions(board):
+            stack.append(ttt.result(board, action))
+    return list(positions.values())
+
+
+def plain_minimax(board):
+    """
+    The exhaustive search minimax used before the transposition table.
+    """
+    best = None
+    for action in ttt.actions(board):
+        child = ttt.result(board, action)
+        if ttt.player(board) == ttt.X:
+            value = ttt.min_value(child)
+            if best is None or value > points:
+                points, best = value, action
+        else:
+            value = ttt.max_value(child)
+            if best is None or value < points:
+                points, best = value, action
+    return best
+
+
+def move_value(board, action):
+    x, o = ttt.to_masks(board)
+    return ttt.solve(*bitboard.play(x, o, 3 * action[0] + action[1]))
+
+
+def run(name, solver, positions):
+    """
+    Times `solver` on every position with cold tables.
+    Returns a dict of totals and the number of moves that differ from
+    the memoized minimax search.
+    """
+    nodes = 0
+    seconds = 0
+    slowest = 0
+    different = 0
+    for board in positions:
+        ttt.transposition_table.clear()
+        ttt.bounds_table.clear()
+        ttt.nodes_visited = 0
+        start = time.perf_counter()
+        move = solver(board)
+        elapsed = time.perf_counter() - start
+        nodes += ttt.nodes_visited
+        seconds += elapsed
+        slowest = max(slowest, elapsed)
+
+        reference = ttt.search_minimax(board)
+        if move_value(board, move) != move_value(board, reference):
+            raise AssertionError(f"{name} chose a losing move on {board}")
+        if move != reference:
+            different += 1
+    return {
+        "nodes": nodes,
+        "seconds": seconds,
+        "slowest": slowest,
+        "different": different
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--plain", action="store_true",
+                        help="also run the original exhaustive minimax")
+    args = parser.parse_args()
+
+    positions = reachable_positions()
+    solvers = [
+        ("opening book", ttt.minimax),
+        ("memoized minimax", ttt.search_minimax),
+        ("alpha-beta, actions order",
+         lambda board: ttt.alphabeta_minimax(board, "actions")),
+        ("alpha-beta, static order",
+         lambda board: ttt.alphabeta_minimax(board, "static")),
+        ("alpha-beta, table order",
+         lambda board: ttt.alphabeta_minimax(board, "tt"))
+    ]
+    if args.plain:
+        solvers.insert(0, ("plain minimax", plain_minimax))
+
+    print(f"{len(positions)} reachable non-terminal positions")
+    for name, solver in solvers:
+        totals = run(name, solver, positions)
+        print(f"  {name}: "
+              f"{totals['nodes'] / len(positions):.1f} nodes/move, "
+              f"{totals['seconds'] / len(positions) * 1000:.3f} ms/move, "
+              f"slowest {totals['slowest'] * 1000:.3f} ms, "
+              f"{totals['different']} moves differ from minimax")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Tic-tac-toe positions as a pair of bit masks.
+
+Bit cols * i + j of `x` is set when X has played cell (i, j), and likewise
+for `o`. Wins are checked against precomputed line masks and whose turn it
+is comes from popcounts, so no board is ever copied. Geometry describes a
+board of any size; the module-level functions are the fast paths for the
+standard 3x3 game.
+"""
+
+from functools import lru_cache
+
+
+class Geometry():
+    """
+    A `rows` x `cols` board where `k` marks in a row, column or diagonal
+    win. win_masks lists every such segment, and cell_lines[c] the ones
+    through cell `c`, so a move only needs checking against those.
+    neighbors[c] masks the cells around `c` and center_order lists the
+    cells from the center outwards, for ordering moves.
+    """
+
+    def __init__(self, rows, cols, k):
+        if not 1 <= k <= max(rows, cols):
+            raise ValueError(f"cannot get {k} in a row on a {rows}x{cols} board")
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.cells = rows * cols
+        self.full = (1 << self.cells) - 1
+
+        self.win_masks = []
+        for i in range(rows):
+            for j in range(cols):
+                for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    end_i = i + di * (k - 1)
+                    end_j = j + dj * (k - 1)
+                    if 0 <= end_i < rows and 0 <= end_j < cols:
+                        self.win_masks.append(sum(
+                            1 << (cols * (i + di * step) + j + dj * step)
+                            for step in range(k)
+                        ))
+        self.cell_lines = [
+            [line for line in self.win_masks if line >> cell & 1]
+            for cell in range(self.cells)
+        ]
+
+        self.neighbors = []
+        for i in range(rows):
+            for j in range(cols):
+                self.neighbors.append(sum(
+                    1 << (cols * (i + di) + j + dj)
+                    for di in (-1, 0, 1) for dj in (-1, 0, 1)
+                    if (di or dj) and 0 <= i + di < rows and 0 <= j + dj < cols
+                ))
+        self.center_order = sorted(
+            range(self.cells),
+            key=lambda c: ((c // cols - (rows - 1) / 2) ** 2
+                           + (c % cols - (cols - 1) / 2) ** 2)
+        )
+
+    def has_line(self, mask):
+        for line in self.win_masks:
+            if mask & line == line:
+                return True
+        return False
+
+    def wins_at(self, mask, cell):
+        """
+        Returns True if `mask` has a winning line through `cell`.
+        """
+        for line in self.cell_lines[cell]:
+            if mask & line == line:
+                return True
+        return False
+
+    def value(self, x, o):
+        """
+        Returns 1 if X has a line, -1 if O has one, 0 otherwise.
+        """
+        if self.has_line(x):
+            return 1
+        if self.has_line(o):
+            return -1
+        return 0
+
+    def is_terminal(self, x, o):
+        return (x | o) == self.full or self.has_line(x) or self.has_line(o)
+
+    def empty_cells(self, x, o):
+        """
+        Returns the indexes of the empty cells in increasing order.
+        """
+        occupied = x | o
+        return [c for c in range(self.cells) if not occupied >> c & 1]
+
+
+@lru_cache(maxsize=None)
+def geometry(rows, cols, k):
+    """
+    Returns the shared Geometry for a board shape and win length.
+    """
+    return Geometry(rows, cols, k)
+
+
+STANDARD = geometry(3, 3, 3)
+FULL = STANDARD.full
+WIN_MASKS = STANDARD.win_masks
+
+# The 8 symmetries of the board (rotations and reflections), each given as
+# the cell every cell is read from
+SYMMETRIES = [
+    (0, 1, 2, 3, 4, 5, 6, 7, 8),
+    (6, 3, 0, 7, 4, 1, 8, 5, 2),
+    (8, 7, 6, 5, 4, 3, 2, 1, 0),
+    (2, 5, 8, 1, 4, 7, 0, 3, 6),
+    (2, 1, 0, 5, 4, 3, 8, 7, 6),
+    (6, 7, 8, 3, 4, 5, 0, 1, 2),
+    (0, 3, 6, 1, 4, 7, 2, 5, 8),
+    (8, 5, 2, 7, 4, 1, 6, 3, 0)
+]
+
+
+def _permute(mask, symmetry):
+    return sum(1 << k for k in range(9) if mask >> symmetry[k] & 1)
+
+
+# SYMMETRY_TABLES[s][mask] is `mask` transformed by SYMMETRIES[s]
+SYMMETRY_TABLES = [
+    [_permute(mask, symmetry) for mask in range(FULL + 1)]
+    for symmetry in SYMMETRIES
+]
+
+
+def x_to_move(x, o):
+    return x.bit_count() == o.bit_count()
+
+
+def has_line(mask):
+    for line in WIN_MASKS:
+        if mask & line == line:
+            return True
+    return False
+
+
+def value(x, o):
+    """
+    Returns 1 if X has a line, -1 if O has one, 0 otherwise.
+    """
+    if has_line(x):
+        return 1
+    if has_line(o):
+        return -1
+    return 0
+
+
+def is_terminal(x, o):
+    return (x | o) == FULL or has_line(x) or has_line(o)
+
+
+def empty_cells(x, o):
+    """
+    Returns the indexes of the empty cells in increasing order.
+    """
+    occupied = x | o
+    return [k for k in range(9) if not occupied >> k & 1]
+
+
+def play(x, o, cell):
+    """
+    Returns the masks after the player to move takes `cell`.
+    """
+    if x_to_move(x, o):
+        return x | 1 << cell, o
+    return x, o | 1 << cell
+
+
+def canonical(x, o):
+    """
+    Returns the same 18-bit code for a position and all its rotations and
+    reflections: the smallest (x | o << 9) among the 8 symmetries.
+    """
+    return min(table[x] | table[o] << 9 for table in SYMMETRY_TABLES)
@@ -0,0 +1,104 @@
+"""
+Perfect-play lookup table for every reachable tic-tac-toe position.
+
+Usage: python book.py
+
+Running this module enumerates the 5,478 legal positions once, solves them
+and writes book.bin next to it. The file is a short header followed by one
+byte per base-3 position index (X = 1, O = 2 in digit 3 * i + j): the low
+nibble holds the best cell plus one (0 when the game is over) and the high
+nibble the minimax value plus one. Positions that cannot occur in a game
+hold UNREACHABLE.
+"""
+
+import os
+
+import bitboard
+
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+MAGIC = b"TTTBOOK1"
+POSITIONS = 3 ** 9
+UNREACHABLE = 0xFF
+
+# BASE3[mask] is the base-3 number with digit 1 at each set bit of `mask`
+BASE3 = [
+    sum(3 ** k for k in range(9) if mask >> k & 1)
+    for mask in range(bitboard.FULL + 1)
+]
+
+
+def position_index(x, o):
+    return BASE3[x] + 2 * BASE3[o]
+
+
+def build_book():
+    """
+    Solves every reachable position and returns the table as bytes.
+    The stored move is the one the minimax search picks, so answers do
+    not change when the book is used.
+    """
+    # tictactoe reads the book when it is imported, so it is only needed
+    # here, while building one
+    import tictactoe as ttt
+
+    table = bytearray([UNREACHABLE]) * POSITIONS
+    stack = [(0, 0)]
+    while stack:
+        x, o = stack.pop()
+        index = position_index(x, o)
+        if table[index] != UNREACHABLE:
+            continue
+
+        value = ttt.solve(x, o)
+        if bitboard.is_terminal(x, o):
+            move = -1
+        else:
+            i, j = ttt.search_minimax(ttt.from_masks(x, o))
+            move = 3 * i + j
+            for k in bitboard.empty_cells(x, o):
+                stack.append(bitboard.play(x, o, k))
+        table[index] = (move + 1) | (value + 1) << 4
+    return bytes(table)
+
+
+def save_book(table, path=BOOK_PATH):
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(table)
+
+
+def load_book(path=BOOK_PATH):
+    """
+    Returns the table stored in `path`, or None if there is no valid book.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if data[:len(MAGIC)] != MAGIC or len(data) != len(MAGIC) + POSITIONS:
+        return None
+    return data[len(MAGIC):]
+
+
+def lookup(table, x, o):
+    """
+    Returns (cell, value) for a position, where cell is None once the game
+    is over, or None if the position cannot occur in a game.
+    """
+    entry = table[position_index(x, o)]
+    if entry == UNREACHABLE:
+        return None
+    cell = (entry & 0x0F) - 1
+    return (None if cell < 0 else cell), (entry >> 4) - 1
+
+
+def main():
+    table = build_book()
+    save_book(table)
+    reachable = sum(entry != UNREACHABLE for entry in table)
+    print(f"Saved {reachable} positions to {BOOK_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Stateless HTTP move server backed by the opening book.
+
+Usage: python server.py [port]
+
+GET /move?board=X.O......  answers {"move": [i, j], "value": v} for the
+player to move, where the board lists the 9 cells row by row using X, O
+and "." (or "-", "_") for empty cells. "move" is null once the game is
+over. Every request is a single table lookup, so no state is kept between
+requests.
+"""
+
+import json
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import book
+
+EMPTY_CELLS = ".-_ "
+
+
+def parse_board(text):
+    """
+    Returns the (x, o) masks for a 9-character board, or None.
+    """
+    if len(text) != 9:
+        return None
+    x = o = 0
+    for k, cell in enumerate(text.upper()):
+        if cell == "X":
+            x |= 1 << k
+        elif cell == "O":
+            o |= 1 << k
+        elif cell not in EMPTY_CELLS:
+            return None
+    return x, o
+
+
+class MoveHandler(BaseHTTPRequestHandler):
+    table = None
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != "/move":
+            self.reply(404, {"error": "not found"})
+            return
+
+        masks = parse_board(parse_qs(url.query).get("board", [""])[0])
+        if masks is None:
+            self.reply(400, {"error": "board must be 9 cells of X, O or ."})
+            return
+        entry = book.lookup(self.table, *masks)
+        if entry is None:
+            self.reply(400, {"error": "position cannot occur in a game"})
+            return
+
+        cell, value = entry
+        move = None if cell is None else [cell // 3, cell % 3]
+        self.reply(200, {"move": move, "value": value})
+
+    def reply(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python server.py [port]")
+    port = int(sys.argv[1]) if len(sys.argv) == 2 else 8000
+
+    MoveHandler.table = book.load_book()
+    if MoveHandler.table is None:
+        sys.exit("No opening book found; run python book.py first.")
+
+    server = ThreadingHTTPServer(("", port), MoveHandler)
+    print(f"Serving moves on port {port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,176 +3,478 @@ Tic Tac Toe Player
 """
 
 import math
-import copy
+import time
+
+import bitboard
+import book
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# Board shape and how many marks in a row win; see configure()
+ROWS = 3
+COLS = 3
+WIN_LENGTH = 3
+
+# Seconds minimax may spend on a move when the board is too big to solve
+TIME_BUDGET = 1.0
+
+# Maps the canonical code of a position to its minimax value
+transposition_table = {}
+
+# Maps the canonical code of a position to a (value, flag) pair found by
+# alpha-beta, where the flag tells whether the value is exact or a bound
+bounds_table = {}
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+# Center first, then corners, then edges
+STATIC_ORDER = (4, 0, 2, 6, 8, 1, 3, 5, 7)
+
+# Number of positions evaluated by the searches, for measuring them
+nodes_visited = 0
+
+# Best move and value of every reachable position, built by book.py
+opening_book = book.load_book()
+
+# Maps (mover, opponent) masks to a (depth, value, flag, best cell) entry
+# found by the depth-limited search on boards of any size
+deepening_table = {}
+
+# Score of a won position, above anything evaluate() returns
+WIN_SCORE = 10 ** 9
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+def configure(rows=3, cols=3, k=3):
+    """
+    Sets the board shape and win length used by new games. Raises
+    ValueError if `k` in a row cannot fit on the board.
+    """
+    global ROWS, COLS, WIN_LENGTH
+    bitboard.geometry(rows, cols, k)
+    ROWS, COLS, WIN_LENGTH = rows, cols, k
+
 
 def initial_state():
     """
     Returns starting state of the board.
     """
-    return [[EMPTY, EMPTY, EMPTY],
-            [EMPTY, EMPTY, EMPTY],
-            [EMPTY, EMPTY, EMPTY]]
+    return [[EMPTY] * COLS for _ in range(ROWS)]
 
 
-def player(board):
+def board_geometry(board):
     """
-    Returns player who has the next turn on a board.
+    Returns the bitboard Geometry of a board, with the configured win length.
     """
+    return bitboard.geometry(len(board), len(board[0]), WIN_LENGTH)
 
-    # The first player is always X
-    if board == initial_state():
-        return X
-    elif terminal(board):
-        return None
-    else:  # Verify the quanty of O's in the board and return the next player
-        countO = sum(row.count(O) for row in board)
-        countX = sum(row.count(X) for row in board)
 
-        if countX > countO:
-            return O
-        else:
-            return X
+def to_masks(board):
+    """
+    Returns the (x, o) bitboard masks of a board.
+    """
+    cols = len(board[0])
+    x = o = 0
+    for i, row in enumerate(board):
+        for j, cell in enumerate(row):
+            if cell == X:
+                x |= 1 << (cols * i + j)
+            elif cell == O:
+                o |= 1 << (cols * i + j)
+    return x, o
+
+
+def from_masks(x, o, geometry=bitboard.STANDARD):
+    """
+    Returns the board for a pair of (x, o) bitboard masks.
+    """
+    cols = geometry.cols
+    return [
+        [X if x >> (cols * i + j) & 1 else O if o >> (cols * i + j) & 1
+         else EMPTY
+         for j in range(cols)]
+        for i in range(geometry.rows)
+    ]
+
 
-    raise NotImplementedError
+def player(board):
+    """
+    Returns player who has the next turn on a board.
+    """
+    x, o = to_masks(board)
+    if board_geometry(board).is_terminal(x, o):
+        return None
+    return X if bitboard.x_to_move(x, o) else O
 
 
 def actions(board):
     """
     Returns set of all possible actions (i, j) available on the board.
     """
-    
-    moves = set()
-    if terminal(board):
-        return moves
-
-    for i in range(3):
-        for j in range(3):
-            if board[i][j] == EMPTY:
-                moves.add((i, j))
-
-    return moves
-    raise NotImplementedError
+    geometry = board_geometry(board)
+    x, o = to_masks(board)
+    if geometry.is_terminal(x, o):
+        return set()
+    return {divmod(k, geometry.cols) for k in geometry.empty_cells(x, o)}
 
 
 def result(board, action):
     """
     Returns the board that results from making move (i, j) on the board.
     """
-
-    if action not in actions(board):
+    x, o = to_masks(board)
+    i, j = action
+    if (board_geometry(board).is_terminal(x, o) or i not in range(len(board))
+            or j not in range(len(board[0])) or board[i][j] != EMPTY):
         raise Exception("Invalid action")
 
-    boardCopy = copy.deepcopy(board)
-    boardCopy[action[0]][action[1]] = player(board)
+    boardCopy = [list(row) for row in board]
+    boardCopy[i][j] = X if bitboard.x_to_move(x, o) else O
     return boardCopy
 
-    raise NotImplementedError
-
 
 def winner(board):
     """
     Returns the winner of the game, if there is one.
     """
-
-    # Verify rows
-    for row in range(3):
-        if board[row][0] == board[row][1] == board[row][2] and board[row][0] is not None:
-            return board[row][0]
-
-    # Verify columns
-    for col in range(3):
-        if board[0][col] == board[1][col] == board[2][col] and board[0][col] is not None:
-            return board[0][col]
-    
-    # Verify main diagonal
-    if board[0][0] == board[1][1] == board[2][2] and board[0][0] is not None:
-        return board[0][0]
-    
-    # Verify secondary diagonal
-    if board[0][2] == board[1][1] == board[2][0] and board[0][2] is not None:
-        return board[0][2]
-
+    value = board_geometry(board).value(*to_masks(board))
+    if value == 1:
+        return X
+    elif value == -1:
+        return O
     return None
 
-    raise NotImplementedError
-
 
 def terminal(board):
     """
     Returns True if game is over, False otherwise.
     """
-
-    # Verify if there is a winner and end the game
-    if winner(board) is not None:
-        return True
-
-    # Verify if there is any empty space in the board
-    if any(EMPTY in row for row in board) is False:
-        return True
-
-    return False
-    raise NotImplementedError
+    return board_geometry(board).is_terminal(*to_masks(board))
 
 
 def utility(board):
     """
     Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
     """
-    if winner(board) == X:
-        return 1
-    elif winner(board) == O:
-        return -1
-    else:
-        return 0
+    return board_geometry(board).value(*to_masks(board))
 
-    raise NotImplementedError
 
 def min_value(board):
+    global nodes_visited
+    nodes_visited += 1
     if terminal(board):
         return utility(board)
-    
+
     v = math.inf
     for action in actions(board):
         v = min(v, max_value(result(board, action)))
     return v
 
 def max_value(board):
+    global nodes_visited
+    nodes_visited += 1
     if terminal(board):
         return utility(board)
-    
+
     v = -math.inf
     for action in actions(board):
         v = max(v, min_value(result(board, action)))
     return v
 
+def solve(x, o):
+    """
+    Returns the minimax value of a position (1 if X wins with perfect
+    play, -1 if O does, 0 for a tie), memoized in transposition_table so
+    each position is searched once up to symmetry.
+    """
+    global nodes_visited
+    nodes_visited += 1
+
+    code = bitboard.canonical(x, o)
+    if code in transposition_table:
+        return transposition_table[code]
+
+    if bitboard.is_terminal(x, o):
+        value = bitboard.value(x, o)
+    else:
+        values = [
+            solve(*bitboard.play(x, o, k)) for k in bitboard.empty_cells(x, o)
+        ]
+        value = max(values) if bitboard.x_to_move(x, o) else min(values)
+
+    transposition_table[code] = value
+    return value
+
+
+def order_moves(x, o, empty, ordering):
+    """
+    Returns the cells in `empty` in the order alpha-beta should try them:
+    as given for "actions", center/corners/edges for "static", and for
+    "tt" best first by the values already in bounds_table, with unknown
+    positions in static order.
+    """
+    if ordering == "actions":
+        return empty
+    moves = [k for k in STATIC_ORDER if k in empty]
+    if ordering == "tt":
+        sign = -1 if bitboard.x_to_move(x, o) else 1
+        def known_value(k):
+            entry = bounds_table.get(
+                bitboard.canonical(*bitboard.play(x, o, k))
+            )
+            return 0 if entry is None else sign * entry[0]
+        moves.sort(key=known_value)
+    return moves
+
+
+def alphabeta(x, o, alpha, beta, ordering="static"):
+    """
+    Returns the minimax value of a position if it lies strictly between
+    `alpha` and `beta`, and otherwise a bound on the side of the window it
+    falls. Results are kept in bounds_table by canonical code.
+    """
+    global nodes_visited
+    nodes_visited += 1
+
+    code = bitboard.canonical(x, o)
+    entry = bounds_table.get(code)
+    if entry is not None:
+        value, flag = entry
+        if flag == EXACT:
+            return value
+        elif flag == LOWER:
+            alpha = max(alpha, value)
+        else:
+            beta = min(beta, value)
+        if alpha >= beta:
+            return value
+
+    if bitboard.is_terminal(x, o):
+        value = bitboard.value(x, o)
+        bounds_table[code] = (value, EXACT)
+        return value
+
+    maximizing = bitboard.x_to_move(x, o)
+    window = (alpha, beta)
+    value = -math.inf if maximizing else math.inf
+    for k in order_moves(x, o, bitboard.empty_cells(x, o), ordering):
+        child = alphabeta(*bitboard.play(x, o, k), alpha, beta, ordering)
+        if maximizing:
+            value = max(value, child)
+            alpha = max(alpha, value)
+        else:
+            value = min(value, child)
+            beta = min(beta, value)
+        if alpha >= beta:
+            break
+
+    if value <= window[0]:
+        bounds_table[code] = (value, UPPER)
+    elif value >= window[1]:
+        bounds_table[code] = (value, LOWER)
+    else:
+        bounds_table[code] = (value, EXACT)
+    return value
+
+
+def alphabeta_minimax(board, ordering="actions"):
+    """
+    Returns an optimal action for the current player on a 3x3 board using
+    alpha-beta search. `ordering` is "actions", "static" or "tt" (see
+    order_moves). The default "actions" returns the same action minimax
+    returns; "static" and "tt" search faster but may pick another action
+    of the same value.
+    """
+    if terminal(board):
+        return None
+
+    x, o = to_masks(board)
+    maximizing = bitboard.x_to_move(x, o)
+    empty = [3 * i + j for i, j in actions(board)]
+
+    # Search each child with a window just above (X) or below (O) the best
+    # value so far; only values inside it can change the choice
+    points = None
+    for k in order_moves(x, o, empty, ordering):
+        child = bitboard.play(x, o, k)
+        if maximizing:
+            value = alphabeta(*child, -math.inf if points is None else points,
+                              math.inf, ordering)
+            better = points is None or value > points
+        else:
+            value = alphabeta(*child, -math.inf,
+                              math.inf if points is None else points, ordering)
+            better = points is None or value < points
+        if better:
+            points = value
+            bestMove = (k // 3, k % 3)
+            if points == (1 if maximizing else -1):
+                break
+    return bestMove
+
+
 def minimax(board):
     """
-    Returns the optimal action for the current player on the board.
+    Returns the optimal action for the current player on the board. Bigger
+    boards cannot be solved in time, so there the best action found within
+    TIME_BUDGET seconds is returned instead.
+    """
+    if terminal(board):
+        return None
+    if board_geometry(board) is not bitboard.STANDARD:
+        return deepening_minimax(board)
+
+    # Answer from the precomputed book when there is one
+    if opening_book is not None:
+        entry = book.lookup(opening_book, *to_masks(board))
+        if entry is not None:
+            cell, _ = entry
+            return (cell // 3, cell % 3)
+    return search_minimax(board)
+
+
+def search_minimax(board):
+    """
+    Returns the optimal action for the current player on a 3x3 board by
+    searching with the memoized solver.
+    """
+    if terminal(board):
+        return None
+
+    x, o = to_masks(board)
+    maximizing = bitboard.x_to_move(x, o)
+
+    # X maximizes and O minimizes the value; ties keep the first action
+    points = None
+    for action in actions(board):
+        value = solve(*bitboard.play(x, o, 3 * action[0] + action[1]))
+        if (points is None
+                or (maximizing and value > points)
+                or (not maximizing and value < points)):
+            points = value
+            bestMove = action
+    return bestMove
+
+
+def evaluate(geometry, me, opp):
+    """
+    Estimates a position for the player `me` to move: every line still
+    open to one player only counts 4 ** marks for them.
+    """
+    score = 0
+    for line in geometry.win_masks:
+        mine = me & line
+        theirs = opp & line
+        if not theirs:
+            if mine:
+                score += 4 ** mine.bit_count()
+        elif not mine:
+            score -= 4 ** theirs.bit_count()
+    return score
+
+
+def order_cells(geometry, me, opp, first=None):
+    """
+    Returns the empty cells in the order the search tries them: `first`,
+    then cells next to a mark, each group from the center outwards.
+    """
+    occupied = me | opp
+    cells = [c for c in geometry.center_order if not occupied >> c & 1]
+    cells.sort(key=lambda c: not geometry.neighbors[c] & occupied)
+    if first is not None:
+        cells.remove(first)
+        cells.insert(0, first)
+    return cells
+
+
+def negamax(geometry, me, opp, last, depth, alpha, beta, deadline):
+    """
+    Returns the value for the player `me` to move of a position `depth`
+    moves deep, the way alphabeta does, after the opponent took cell `last`.
+    Only lines through `last` can have just been completed. Raises
+    SearchTimeout once `deadline` has passed.
+    """
+    global nodes_visited
+    nodes_visited += 1
+    if nodes_visited % 1024 == 0 and time.perf_counter() > deadline:
+        raise SearchTimeout
+
+    # Wins score higher the more cells are left, so quicker ones are preferred
+    occupied = me | opp
+    if last is not None and geometry.wins_at(opp, last):
+        return -(WIN_SCORE + geometry.cells - occupied.bit_count())
+    if occupied == geometry.full:
+        return 0
+    if depth == 0:
+        return evaluate(geometry, me, opp)
+
+    first = None
+    entry = deepening_table.get((me, opp))
+    if entry is not None:
+        entry_depth, value, flag, first = entry
+        if entry_depth >= depth:
+            if flag == EXACT:
+                return value
+            elif flag == LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                return value
+
+    window = (alpha, beta)
+    value = -math.inf
+    for cell in order_cells(geometry, me, opp, first):
+        child = -negamax(geometry, opp, me | 1 << cell, cell, depth - 1,
+                         -beta, -alpha, deadline)
+        if child > value:
+            value = child
+            best = cell
+        alpha = max(alpha, value)
+        if alpha >= beta:
+            break
+
+    if value <= window[0]:
+        flag = UPPER
+    elif value >= window[1]:
+        flag = LOWER
+    else:
+        flag = EXACT
+    deepening_table[(me, opp)] = (depth, value, flag, best)
+    return value
+
+
+def deepening_minimax(board, budget=None):
+    """
+    Returns the best action for the current player on a board of any size
+    found by searching one move deeper at a time until `budget` seconds
+    (TIME_BUDGET by default) run out or the game is solved. Each search
+    tries the best move of the previous one first.
     """
     if terminal(board):
         return None
 
-    # In the X player, try to maximize the value with the best move
-    elif player(board) == X:
-        points = -math.inf
-        for action in actions(board):
-            if min_value(result(board, action)) > points:
-                points = min_value(result(board, action))
-                bestMove = action
-        return bestMove 
-   
-    # In the O player, try to minimize the value with the best move
-    elif player(board) == O:
-        points = math.inf
-        for action in actions(board):
-            if max_value(result(board, action)) < points:
-                points = max_value(result(board, action))
-                bestMove = action
-        return bestMove    
-
-    raise NotImplementedError
\ No newline at end of file
+    geometry = board_geometry(board)
+    x, o = to_masks(board)
+    me, opp = (x, o) if bitboard.x_to_move(x, o) else (o, x)
+    deadline = time.perf_counter() + (TIME_BUDGET if budget is None else budget)
+
+    deepening_table.clear()
+    cell = order_cells(geometry, me, opp)[0]
+    empty = geometry.cells - (me | opp).bit_count()
+    for depth in range(1, empty + 1):
+        try:
+            value = negamax(geometry, me, opp, None, depth,
+                            -math.inf, math.inf, deadline)
+        except SearchTimeout:
+            break
+        cell = deepening_table[(me, opp)][3]
+        if abs(value) >= WIN_SCORE:
+            break
+    return divmod(cell, geometry.cols)